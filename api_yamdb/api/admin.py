@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import OutgoingEmail
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("to", "subject", "status", "attempts", "next_attempt_at")
+    list_filter = ("status",)
+    search_fields = ("to",)
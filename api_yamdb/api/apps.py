@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .connections import check_connections
+        from .profiling import install_query_timer
+
+        connection_created.connect(install_query_timer)
+        request_started.connect(check_connections)
@@ -0,0 +1,122 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.urls import URLPattern
+
+from .connections import check_connections
+
+# Маршруты чтения, которые в ASGI-режиме обслуживаются асинхронно.
+ASYNC_ROUTES = (
+    "titles-list",
+    "titles-detail",
+    "reviews-list",
+    "comments-list",
+    "leaderboards-list",
+)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_VIEW_THREADS, thread_name_prefix="async-view"
+)
+
+
+def async_view(view):
+    """Асинхронная обертка синхронного представления DRF.
+
+    Под ASGI Django 3.2 выполняет синхронные представления в одном общем
+    потоке, поэтому процесс обслуживает запросы по одному. Обертка
+    выполняет представление и отрисовку ответа в пуле потоков (размер
+    задает ASYNC_VIEW_THREADS), и медленные клиенты не блокируют друг
+    друга. Соединения с БД в потоках пула проверяются и закрываются так
+    же, как при обычном запросе."""
+
+    def run(request, *args, **kwargs):
+        close_old_connections()
+        check_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(
+            run, thread_sensitive=False, executor=executor
+        )(request, *args, **kwargs)
+
+    return wrapper
+
+
+def async_routes(patterns, names=ASYNC_ROUTES):
+    """Заменяет представления маршрутов names асинхронными обертками."""
+    return [
+        URLPattern(
+            pattern.pattern,
+            async_view(pattern.callback),
+            pattern.default_args,
+            pattern.name,
+        )
+        if isinstance(pattern, URLPattern) and pattern.name in names
+        else pattern
+        for pattern in patterns
+    ]
+
+
+class ThreadIterator:
+    """Итератор по iterable, который выполняется в отдельном потоке.
+
+    Под ASGI Django 3.2 читает потоковый ответ прямо в цикле событий,
+    где запросы к БД запрещены. Генератор с запросами к БД работает в
+    своем потоке со своим соединением, а цикл событий забирает из
+    очереди готовые значения. Когда ответ закрыт (клиент отключился),
+    поток останавливается."""
+
+    def __init__(self, iterable, buffer_size=100):
+        self.iterable = iterable
+        self.items = queue.Queue(maxsize=buffer_size)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.produce, daemon=True)
+
+    def put(self, item):
+        """Кладет значение в очередь. False - итератор уже закрыт."""
+        while not self.stopped.is_set():
+            try:
+                self.items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce(self):
+        try:
+            for value in self.iterable:
+                if not self.put((True, value)):
+                    return
+            self.put((False, None))
+        except Exception as error:
+            self.put((False, error))
+        finally:
+            connections.close_all()
+
+    def __iter__(self):
+        self.thread.start()
+        try:
+            while True:
+                more, value = self.items.get()
+                if not more:
+                    if value is not None:
+                        raise value
+                    return
+                yield value
+        finally:
+            self.close()
+
+    def close(self):
+        self.stopped.set()
@@ -0,0 +1,154 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import User
+
+# Утверждения токена, которые нужны для проверки прав без запроса к БД.
+CLAIM_FIELDS = ("username", "role", "is_staff")
+# Состояние пользователя в кэше: утверждения могли устареть.
+USER_STATE_FIELDS = CLAIM_FIELDS + ("is_active",)
+LOCAL_CACHE_MAX_SIZE = 10000
+
+_local_states = {}
+_local_lock = threading.Lock()
+
+
+def token_for_user(user):
+    """Refresh-токен с ролью и именем пользователя в утверждениях.
+    Access-токен наследует их от refresh-токена."""
+    token = RefreshToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+def user_state_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def shared_cache():
+    """Кэш по умолчанию, если он общий для процессов, иначе None.
+    LocMemCache живет в памяти одного воркера: forget_user_state не
+    сбросил бы в нем состояние для остальных воркеров."""
+    backend = caches[DEFAULT_CACHE_ALIAS]
+    return None if isinstance(backend, LocMemCache) else backend
+
+
+def forget_user_state(user_id):
+    """Сбрасывает закэшированное состояние после изменения пользователя.
+    В других процессах старое значение живет не дольше
+    AUTH_STATE_LOCAL_SECONDS."""
+    cache = shared_cache()
+    if cache is not None:
+        cache.delete(user_state_key(user_id))
+    with _local_lock:
+        _local_states.pop(user_id, None)
+
+
+def get_user_state(user_id):
+    """Роль и статус пользователя: из памяти процесса, из общего кэша
+    или, при промахе, из БД. Пустой словарь - пользователь удален.
+    Если общего кэша нет, после памяти процесса читается БД."""
+    now = time.monotonic()
+    with _local_lock:
+        entry = _local_states.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    cache = shared_cache()
+    state = None if cache is None else cache.get(user_state_key(user_id))
+    if state is None:
+        state = (
+            User.objects.filter(pk=user_id)
+            .values(*USER_STATE_FIELDS)
+            .first()
+        ) or {}
+        if cache is not None:
+            cache.set(
+                user_state_key(user_id),
+                state,
+                settings.AUTH_STATE_CACHE_SECONDS,
+            )
+    with _local_lock:
+        if len(_local_states) >= LOCAL_CACHE_MAX_SIZE:
+            _local_states.clear()
+        _local_states[user_id] = (
+            now + settings.AUTH_STATE_LOCAL_SECONDS, state
+        )
+    return state
+
+
+class LightUser(TokenUser):
+    """Пользователь, собранный из утверждений токена и кэша состояния,
+    без запроса к БД. Остальные поля профиля загружаются из БД при
+    первом обращении к ним."""
+
+    def __init__(self, token, state):
+        super().__init__(token)
+        self.__dict__.update(state)
+
+    @cached_property
+    def role(self):
+        return self.token.get("role")
+
+    @property
+    def is_admin(self):
+        return self.role == "admin"
+
+    @property
+    def is_moderator(self):
+        return self.role == "moderator"
+
+    @property
+    def is_user(self):
+        return self.role == "user"
+
+    @cached_property
+    def user(self):
+        return User.objects.get(pk=self.pk)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        return self.pk == getattr(other, "pk", None)
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без загрузки пользователя из БД на каждый
+    запрос. Токены без утверждения role (выпущенные раньше)
+    обрабатываются как в JWTAuthentication."""
+
+    def get_user(self, validated_token):
+        if "role" not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+        state = get_user_state(user_id)
+        if not state:
+            raise AuthenticationFailed(
+                "User not found", code="user_not_found"
+            )
+        if not state["is_active"]:
+            raise AuthenticationFailed(
+                "User is inactive", code="user_inactive"
+            )
+        return LightUser(validated_token, state)
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import math
+import random
+import time
+from collections import defaultdict
+
+from django.test import AsyncClient, Client
+from reviews.models import Genre, Review, Title
+
+from .profiling import RequestProfile, profile_request
+from .renderers import json_backend
+
+WSGI = "wsgi"
+ASGI = "asgi"
+MODES = (WSGI, ASGI)
+
+# Смесь запросов: (имя сценария, вес). Веса примерно соответствуют
+# доле обращений к эндпоинтам в продакшене.
+REQUEST_MIX = (
+    ("titles_list", 30),
+    ("titles_filter_genre", 8),
+    ("titles_search", 5),
+    ("title_detail", 15),
+    ("categories_list", 5),
+    ("genres_list", 5),
+    ("reviews_list", 20),
+    ("review_detail", 4),
+    ("comments_list", 8),
+)
+
+
+def percentile(values, percent):
+    """Процентиль с линейной интерполяцией между соседними значениями."""
+    if not values:
+        return None
+    values = sorted(values)
+    position = (len(values) - 1) * percent / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return values[lower]
+    return values[lower] + (values[upper] - values[lower]) * (
+        position - lower
+    )
+
+
+class Scenarios:
+    """Генератор адресов запросов по реальным данным из базы."""
+
+    def __init__(self, rng, sample_size=500):
+        self.rng = rng
+        self.title_ids = list(
+            Title.objects.filter(reviews_count__gt=0)
+            .values_list("id", flat=True)[:sample_size]
+        ) or list(Title.objects.values_list("id", flat=True)[:sample_size])
+        self.reviews = list(
+            Review.objects.filter(title_id__in=self.title_ids)
+            .values_list("title_id", "id")[:sample_size]
+        )
+        self.genres = list(
+            Genre.objects.values_list("slug", flat=True)[:sample_size]
+        )
+        self.words = [
+            name.split()[0]
+            for name in Title.objects.values_list("name", flat=True)[:50]
+            if name.split()
+        ]
+        if not self.title_ids or not self.reviews:
+            raise ValueError(
+                "Для нагрузочного теста нужны произведения и отзывы, "
+                "запустите generate_fake_data."
+            )
+
+    def url(self, name):
+        choice = self.rng.choice
+        title_id, review_id = choice(self.reviews)
+        return {
+            "titles_list": "/api/v1/titles/",
+            "titles_filter_genre": (
+                f"/api/v1/titles/?genre={choice(self.genres)}"
+            ),
+            "titles_search": f"/api/v1/titles/?search={choice(self.words)}",
+            "title_detail": f"/api/v1/titles/{choice(self.title_ids)}/",
+            "categories_list": "/api/v1/categories/",
+            "genres_list": "/api/v1/genres/",
+            "reviews_list": f"/api/v1/titles/{title_id}/reviews/",
+            "review_detail": (
+                f"/api/v1/titles/{title_id}/reviews/{review_id}/"
+            ),
+            "comments_list": (
+                f"/api/v1/titles/{title_id}/reviews/{review_id}/comments/"
+            ),
+        }[name]
+
+
+class Benchmark:
+    """Прогоняет смесь запросов через тестовый клиент Django в текущем
+    процессе и собирает задержки и число SQL-запросов по сценариям.
+
+    В режиме wsgi запросы идут по одному, как в синхронном воркере
+    gunicorn. В режиме asgi запросы идут через ASGI-обработчик по
+    concurrency одновременно, как в воркере uvicorn."""
+
+    def __init__(
+        self,
+        requests=1000,
+        warmup=50,
+        seed=0,
+        mix=REQUEST_MIX,
+        mode=WSGI,
+        concurrency=1,
+    ):
+        self.requests = requests
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.mix = mix
+        self.mode = mode
+        self.concurrency = concurrency
+
+    def plan(self, scenarios, count):
+        names = [name for name, _ in self.mix]
+        weights = [weight for _, weight in self.mix]
+        return [
+            (name, scenarios.url(name))
+            for name in self.rng.choices(names, weights=weights, k=count)
+        ]
+
+    @staticmethod
+    def request(client, url):
+        with profile_request(RequestProfile()) as profile:
+            response = client.get(url)
+        return response.status_code, profile.elapsed, profile.db_count
+
+    @staticmethod
+    async def arequest(client, url):
+        with profile_request(RequestProfile()) as profile:
+            response = await client.get(url)
+        return response.status_code, profile.elapsed, profile.db_count
+
+    def run_sync(self, plan):
+        client = Client()
+        return [(name,) + self.request(client, url) for name, url in plan]
+
+    async def run_async(self, plan):
+        client = AsyncClient()
+        queue = list(reversed(plan))
+        results = []
+
+        async def worker():
+            while queue:
+                name, url = queue.pop()
+                results.append((name,) + await self.arequest(client, url))
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return results
+
+    def execute(self, plan):
+        if self.mode == ASGI:
+            return asyncio.run(self.run_async(plan))
+        return self.run_sync(plan)
+
+    def run(self):
+        scenarios = Scenarios(self.rng)
+        self.execute(self.plan(scenarios, self.warmup))
+        plan = self.plan(scenarios, self.requests)
+        started = time.perf_counter()
+        results = self.execute(plan)
+        total = time.perf_counter() - started
+        samples = defaultdict(list)
+        errors = defaultdict(int)
+        for name, status, elapsed, queries in results:
+            if status >= 400:
+                errors[name] += 1
+            samples[name].append((elapsed, queries))
+        report = build_report(samples, errors, total)
+        report.update(
+            mode=self.mode,
+            concurrency=self.concurrency,
+            json_backend=json_backend(),
+        )
+        return report
+
+
+def build_report(samples, errors, total_seconds):
+    """Сводка по сценариям в виде словаря, пригодного для JSON."""
+    endpoints = {}
+    for name, values in sorted(samples.items()):
+        latencies = [elapsed * 1000 for elapsed, _ in values]
+        busy = sum(elapsed for elapsed, _ in values)
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "throughput_rps": round(len(values) / busy, 1) if busy else None,
+            "queries_per_request": round(
+                sum(queries for _, queries in values) / len(values), 2
+            ),
+        }
+    requests = sum(len(values) for values in samples.values())
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "requests": requests,
+        "seconds": round(total_seconds, 3),
+        "throughput_rps": round(requests / total_seconds, 1),
+        "endpoints": endpoints,
+    }
+
+
+def compare_reports(baseline, current, threshold=0.2):
+    """Список регрессий: рост p95 больше чем на threshold или рост
+    числа SQL-запросов на запрос."""
+    regressions = []
+    for name, now in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if before is None:
+            continue
+        if now["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {before['p95_ms']} -> {now['p95_ms']} мс"
+            )
+        if now["queries_per_request"] > before["queries_per_request"]:
+            regressions.append(
+                f"{name}: запросов к БД {before['queries_per_request']} -> "
+                f"{now['queries_per_request']}"
+            )
+    return regressions
+
+
+def compare_latencies(baseline, current):
+    """Строки (эндпоинт, p50 до, p50 после, изменение p50 в %) двух
+    прогонов одного плана запросов."""
+    rows = []
+    for name, now in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None or not before["p50_ms"]:
+            continue
+        change = (now["p50_ms"] / before["p50_ms"] - 1) * 100
+        rows.append(
+            (name, before["p50_ms"], now["p50_ms"], round(change, 1))
+        )
+    return rows
+
+
+def load_report(path):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_report(report, path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
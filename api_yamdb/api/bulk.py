@@ -0,0 +1,128 @@
+from django.conf import settings
+from django.db import IntegrityError, connections, router, transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import bump_versions
+from .db_router import mark_sticky
+
+# Статус ответа, если создана только часть объектов.
+MULTI_STATUS = 207
+
+
+def returns_bulk_pks(model):
+    """Возвращает ли БД первичные ключи строк, вставленных
+    bulk_create."""
+    alias = router.db_for_write(model)
+    return connections[alias].features.can_return_rows_from_bulk_insert
+
+
+def insert_objects(model, objects):
+    """Вставляет объекты одним bulk_create. Если БД не возвращает
+    первичные ключи вставленных строк (SQLite в Django 3.2), объекты
+    сохраняются по одному - вызывающий код уже открыл транзакцию."""
+    if returns_bulk_pks(model):
+        return model.objects.bulk_create(
+            objects, batch_size=settings.BULK_BATCH_SIZE
+        )
+    for obj in objects:
+        obj.save(force_insert=True)
+    return objects
+
+
+class BulkCreateView(APIView):
+    """Создание массива объектов одним запросом. Ссылки проверяются по
+    справочникам, загруженным заранее несколькими запросами на весь
+    массив, объекты записываются в одной транзакции. Ответ содержит
+    результат по каждому элементу: index, status и data или errors."""
+
+    model = None
+    item_serializer_class = None
+    output_serializer_class = None
+    cache_resources = ()
+
+    def post(self, request):
+        items = self.get_items(request)
+        validated, errors = [], {}
+        for index, item in enumerate(items):
+            serializer = self.item_serializer_class(data=item)
+            if serializer.is_valid():
+                validated.append((index, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+        lookups = self.prefetch([data for _, data in validated])
+        objects = []
+        for index, data in validated:
+            try:
+                objects.append((index, self.build(data, lookups)))
+            except ValidationError as error:
+                errors[index] = error.detail
+        if objects:
+            try:
+                with transaction.atomic():
+                    insert_objects(self.model, [obj for _, obj in objects])
+                    self.after_insert([obj for _, obj in objects], lookups)
+                    transaction.on_commit(
+                        lambda: bump_versions(self.cache_resources)
+                    )
+            except IntegrityError:
+                return Response(
+                    {"detail": "Данные изменились во время записи, "
+                               "повторите запрос"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            mark_sticky(request.user)
+        return self.build_response(objects, errors)
+
+    def get_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError("Ожидается непустой список объектов")
+        if len(items) > settings.BULK_MAX_ITEMS:
+            raise ValidationError(
+                f"Не более {settings.BULK_MAX_ITEMS} объектов за запрос"
+            )
+        return items
+
+    def prefetch(self, items):
+        """Справочники для проверки ссылок всех элементов."""
+        return {}
+
+    def build(self, data, lookups):
+        """Объект модели по проверенным данным элемента. Ошибки ссылок
+        сообщаются через ValidationError."""
+        return self.model(**data)
+
+    def after_insert(self, objects, lookups):
+        """Дополнительные записи в той же транзакции."""
+
+    def build_response(self, objects, errors):
+        context = {"request": self.request, "author_names": {}}
+        results = [
+            {
+                "index": index,
+                "status": status.HTTP_201_CREATED,
+                "data": self.output_serializer_class(
+                    obj, context=context
+                ).data,
+            }
+            for index, obj in objects
+        ]
+        results.extend(
+            {
+                "index": index,
+                "status": status.HTTP_400_BAD_REQUEST,
+                "errors": item_errors,
+            }
+            for index, item_errors in errors.items()
+        )
+        results.sort(key=lambda result: result["index"])
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif not objects:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = MULTI_STATUS
+        return Response(results, status=response_status)
@@ -0,0 +1,170 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from .metrics import RESPONSE_CACHE
+
+# Ресурсы, от которых зависят ответы вьюсетов. Изменение любого из них
+# меняет версию ресурса и тем самым ключи всех зависящих от него ответов.
+TITLES = "titles"
+GENRES = "genres"
+CATEGORIES = "categories"
+REVIEWS = "reviews"
+COMMENTS = "comments"
+USERS = "users"
+LEADERBOARDS = "leaderboards"
+RESOURCES = (
+    TITLES, GENRES, CATEGORIES, REVIEWS, COMMENTS, USERS, LEADERBOARDS
+)
+
+
+def version_key(resource):
+    return f"version:{resource}"
+
+
+def modified_key(resource):
+    return f"modified:{resource}"
+
+
+def get_versions(resources):
+    """Текущие версии ресурсов. Отсутствующая в кэше версия заводится
+    заново от текущего времени, чтобы не совпасть с вытесненной."""
+    keys = [version_key(resource) for resource in resources]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_last_modified(resources):
+    """Время последнего изменения ресурсов (unix time). Если отметки
+    в кэше нет, изменение считается произошедшим сейчас."""
+    keys = [modified_key(resource) for resource in resources]
+    stored = cache.get_many(keys)
+    for key in keys:
+        if key not in stored:
+            cache.add(key, int(time.time()), None)
+            stored[key] = cache.get(key)
+    return max(stored.values())
+
+
+def changed_key(resource):
+    return f"changed:{resource}"
+
+
+def bump_version(resource):
+    """Инвалидирует все закэшированные ответы, зависящие от ресурса."""
+    key = version_key(resource)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+    cache.set(modified_key(resource), int(time.time()), None)
+    cache.set(changed_key(resource), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+def recently_changed(resources):
+    """Менялся ли какой-либо из ресурсов за последние
+    REPLICA_STICKY_SECONDS секунд. Реплики могли еще не получить
+    изменение, а ответ с их данными попал бы в кэш и ETag новой
+    версии."""
+    return bool(cache.get_many([changed_key(r) for r in resources]))
+
+
+def bump_versions(resources=RESOURCES):
+    for resource in resources:
+        bump_version(resource)
+
+
+def normalized_query(request):
+    """Параметры запроса в каноническом виде: порядок и пустые значения
+    не влияют на ключ кэша."""
+    return "&".join(
+        f"{name}={value}"
+        for name in sorted(request.GET)
+        for value in sorted(request.GET.getlist(name))
+        if value != ""
+    )
+
+
+class CachedListMixin:
+    """Условные GET-запросы и кэш ответов для list.
+
+    Ответы содержат ETag, вычисленный из адреса, параметров запроса,
+    версий ресурсов из cache_resources и выбранного формата ответа, и
+    Last-Modified. Совпадающие
+    If-None-Match/If-Modified-Since получают 304 без выборки данных.
+    Ответы анонимным пользователям дополнительно кэшируются."""
+
+    cache_resources = ()
+
+    def is_cacheable(self, request):
+        return (
+            request.method == "GET"
+            and not request.user.is_authenticated
+            and settings.RESPONSE_CACHE_TIMEOUT > 0
+        )
+
+    def get_response_cache_key(self, request):
+        versions = get_versions(self.cache_resources)
+        # Схема и хост входят в ключ: ссылки next/previous абсолютные.
+        raw = (
+            f"{request.build_absolute_uri(request.path)}"
+            f"?{normalized_query(request)}"
+        )
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        version = ".".join(str(version) for version in versions)
+        return f"response:{self.basename}:{version}:{digest}"
+
+    def get_etag(self, request, cache_key):
+        """Данные ответа не зависят от формата, поэтому кэшируются
+        вместе, а ETag у ответов в JSON и в браузерном API разный."""
+        raw = f"{cache_key}:{request.accepted_media_type}"
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        etag = self.get_etag(request, key)
+        last_modified = get_last_modified(self.cache_resources)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            RESPONSE_CACHE.labels("not_modified").inc()
+            return not_modified
+        cacheable = self.is_cacheable(request)
+        data = cache.get(key) if cacheable else None
+        if data is not None:
+            RESPONSE_CACHE.labels("hit").inc()
+            response = Response(data)
+        else:
+            RESPONSE_CACHE.labels("miss" if cacheable else "bypass").inc()
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200 and cacheable:
+                cache.set(
+                    key, response.data, settings.RESPONSE_CACHE_TIMEOUT
+                )
+        if response.status_code == 200:
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+            patch_vary_headers(response, ("Accept",))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedListRetrieveMixin(CachedListMixin):
+    """Кэширует ответы анонимным пользователям на list и retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
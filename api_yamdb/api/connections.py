@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.db import connections
+
+from .metrics import DB_CONNECTION_REUSES, DB_HEALTH_CHECK_FAILURES
+
+
+def check_connections(**kwargs):
+    """Проверка постоянных соединений в начале запроса.
+
+    Устаревшие по CONN_MAX_AGE соединения к этому моменту уже закрыты
+    close_old_connections. Оставшиеся открытыми при DB_CONN_HEALTH_CHECKS
+    проверяются запросом к БД, и разорванное соединение (перезапуск
+    PostgreSQL или pgbouncer) закрывается до того, как на нем упадет
+    запрос пользователя."""
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        if settings.DB_CONN_HEALTH_CHECKS and not connection.is_usable():
+            DB_HEALTH_CHECK_FAILURES.labels(connection.alias).inc()
+            connection.close()
+        else:
+            DB_CONNECTION_REUSES.labels(connection.alias).inc()
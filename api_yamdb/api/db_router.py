@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import (DEFAULT_DB_ALIAS, DatabaseError, OperationalError,
+                       connections)
+from django.utils.connection import ConnectionDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+from .cache import recently_changed
+
+# База для чтения в текущем запросе. Задается ReplicaReadMixin только на
+# время list и retrieve, во всех остальных случаях чтение идет с primary.
+read_database = ContextVar("read_database", default=None)
+
+# Реплики, к которым не удалось подключиться: alias -> время, до
+# которого реплика не используется.
+_down_until = {}
+_down_lock = threading.Lock()
+
+
+def sticky_key(user_id):
+    return f"replica-sticky:{user_id}"
+
+
+def mark_sticky(user):
+    """После записи пользователь читает с primary REPLICA_STICKY_SECONDS
+    секунд, пока реплики не догонят его изменения."""
+    cache.set(sticky_key(user.pk), 1, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user):
+    return user.is_authenticated and cache.get(sticky_key(user.pk)) is not None
+
+
+def mark_unavailable(alias):
+    """Реплика не используется REPLICA_RETRY_SECONDS секунд."""
+    with _down_lock:
+        _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+def is_available(alias):
+    """Проверяет подключение к реплике. Недоступная реплика пропускается
+    REPLICA_RETRY_SECONDS секунд."""
+    with _down_lock:
+        if _down_until.get(alias, 0) > time.monotonic():
+            return False
+    try:
+        connections[alias].ensure_connection()
+    except (ConnectionDoesNotExist, DatabaseError):
+        mark_unavailable(alias)
+        return False
+    return True
+
+
+def choose_read_database(request, resources=()):
+    """Реплика по весам DATABASE_REPLICAS или primary, если реплик нет,
+    все они недоступны, пользователь недавно что-то записал или
+    недавно менялись читаемые ресурсы resources."""
+    replicas = {
+        alias: weight
+        for alias, weight in settings.DATABASE_REPLICAS.items()
+        if weight > 0
+    }
+    if (
+        not replicas
+        or is_sticky(request.user)
+        or recently_changed(resources)
+    ):
+        return DEFAULT_DB_ALIAS
+    while replicas:
+        alias = random.choices(
+            list(replicas), weights=list(replicas.values())
+        )[0]
+        if is_available(alias):
+            return alias
+        del replicas[alias]
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    """Чтение в list и retrieve - с реплики, выбранной ReplicaReadMixin,
+    все остальное - с primary."""
+
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Схема реплик приходит с репликацией."""
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaReadMixin:
+    """Отправляет запросы list и retrieve вьюсета на реплику, а после
+    успешной записи закрепляет пользователя за primary. Пока реплики
+    догоняют изменение ресурсов из cache_resources, чтение идет с
+    primary, чтобы в кэш ответов под новой версией не попали старые
+    данные. Если реплика отказала посреди запроса, он повторяется на
+    primary."""
+
+    replica_actions = ("list", "retrieve")
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            self.action in self.replica_actions
+            and request.method in SAFE_METHODS
+        ):
+            self._read_database_token = read_database.set(
+                choose_read_database(
+                    request, getattr(self, "cache_resources", ())
+                )
+            )
+
+    def handle_exception(self, exc):
+        alias = read_database.get()
+        if not isinstance(exc, OperationalError) or alias in (
+            None, DEFAULT_DB_ALIAS
+        ):
+            return super().handle_exception(exc)
+        mark_unavailable(alias)
+        read_database.set(DEFAULT_DB_ALIAS)
+        handler = getattr(self, self.request.method.lower())
+        try:
+            return handler(self.request, *self.args, **self.kwargs)
+        except Exception as retry_exc:
+            return super().handle_exception(retry_exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_read_database_token", None)
+        if token is not None:
+            read_database.reset(token)
+            self._read_database_token = None
+        elif (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            mark_sticky(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -1,6 +1,8 @@
 from django_filters import rest_framework as filters
 from reviews.models import Title
 
+from .search import search_titles
+
 
 class TitleFilter(filters.FilterSet):
     """Фильтр выборки произведений по определенным полям."""
@@ -13,6 +15,11 @@ class TitleFilter(filters.FilterSet):
     )
     name = filters.CharFilter(field_name="name", lookup_expr="contains")
     year = filters.NumberFilter(field_name="year", lookup_expr="exact")
+    search = filters.CharFilter(method="filter_search")
+
+    def filter_search(self, queryset, name, value):
+        """Поиск по названию и описанию с ранжированием результатов."""
+        return search_titles(queryset, value)
 
     class Meta:
         model = Title
@@ -0,0 +1,153 @@
+from api.benchmark import (ASGI, MODES, WSGI, Benchmark, compare_latencies,
+                           compare_reports, load_report, save_report)
+from api.cache import bump_versions
+from api.renderers import JSON_BACKENDS, ORJSON, STDLIB, json_backend
+from django.conf import settings as django_settings
+from django.core.management import BaseCommand, CommandError, call_command
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    """Нагрузочный тест API в текущем процессе."""
+
+    help = (
+        "Прогоняет смесь запросов к API и выводит p50/p95/p99, "
+        "пропускную способность и число SQL-запросов по эндпоинтам."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--mode",
+            choices=MODES,
+            default=WSGI,
+            help=(
+                "wsgi - запросы по одному, asgi - через ASGI-обработчик "
+                "по --concurrency одновременно."
+            ),
+        )
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument(
+            "--generate",
+            type=float,
+            metavar="SCALE",
+            help="Сначала создать данные generate_fake_data --scale SCALE.",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Отключить кэш ответов, чтобы измерять работу с БД.",
+        )
+        parser.add_argument(
+            "--json-backend",
+            choices=JSON_BACKENDS,
+            help="Библиотека JSON для ответов, по умолчанию JSON_BACKEND.",
+        )
+        parser.add_argument(
+            "--compare-json-backends",
+            action="store_true",
+            help=(
+                "Прогнать тест со stdlib и с orjson и сравнить p50 "
+                "по эндпоинтам."
+            ),
+        )
+        parser.add_argument("--output", help="Сохранить отчет в JSON.")
+        parser.add_argument(
+            "--compare", help="JSON-отчет предыдущего запуска для сравнения."
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Допустимый рост p95 относительно --compare (0.2 = 20%%).",
+        )
+
+    def handle(self, *args, **options):
+        if options["generate"]:
+            call_command("generate_fake_data", scale=options["generate"])
+        if options["mode"] == ASGI and not django_settings.ASYNC_VIEWS:
+            print(
+                "ASYNC_VIEWS выключен: асинхронные представления не "
+                "используются, запустите с ASYNC_VIEWS=true."
+            )
+        settings = {"ALLOWED_HOSTS": ["*"]}
+        if options["no_cache"]:
+            settings["RESPONSE_CACHE_TIMEOUT"] = 0
+        if options["json_backend"]:
+            settings["JSON_BACKEND"] = options["json_backend"]
+        if options["compare_json_backends"]:
+            self.compare_json_backends(options, settings)
+            return
+        report = self.run_benchmark(options, settings)
+        self.print_report(report)
+        if options["output"]:
+            save_report(report, options["output"])
+        if options["compare"]:
+            regressions = compare_reports(
+                load_report(options["compare"]), report, options["threshold"]
+            )
+            if regressions:
+                raise CommandError(
+                    "Регрессии производительности:\n" + "\n".join(regressions)
+                )
+            print("Регрессий относительно предыдущего запуска нет.")
+
+    @staticmethod
+    def run_benchmark(options, settings):
+        benchmark = Benchmark(
+            requests=options["requests"],
+            warmup=options["warmup"],
+            seed=options["seed"],
+            mode=options["mode"],
+            concurrency=(
+                options["concurrency"] if options["mode"] == ASGI else 1
+            ),
+        )
+        try:
+            with override_settings(**settings):
+                return benchmark.run()
+        except ValueError as error:
+            raise CommandError(error)
+
+    def compare_json_backends(self, options, settings):
+        """Один и тот же план запросов со stdlib и с orjson. Перед каждым
+        прогоном кэш ответов сбрасывается, чтобы оба отрисовывали ответы
+        заново."""
+        reports = {}
+        for backend in (STDLIB, ORJSON):
+            settings["JSON_BACKEND"] = backend
+            bump_versions()
+            reports[backend] = self.run_benchmark(options, settings)
+            if reports[backend]["json_backend"] != backend:
+                raise CommandError(f"{backend} не установлен.")
+        print(f"{'эндпоинт':<22}{'stdlib p50':>12}{'orjson p50':>12}"
+              f"{'изменение':>11}")
+        for name, before, now, change in compare_latencies(
+            reports[STDLIB], reports[ORJSON]
+        ):
+            print(f"{name:<22}{before:>12.2f}{now:>12.2f}{change:>10.1f}%")
+        print(
+            f"Всего запросов/с: stdlib {reports[STDLIB]['throughput_rps']}, "
+            f"orjson {reports[ORJSON]['throughput_rps']}."
+        )
+
+    def print_report(self, report):
+        print(
+            f"{'эндпоинт':<22}{'запросов':>9}{'p50 мс':>9}{'p95 мс':>9}"
+            f"{'p99 мс':>9}{'rps':>9}{'SQL':>7}"
+        )
+        for name, row in report["endpoints"].items():
+            print(
+                f"{name:<22}{row['requests']:>9}{row['p50_ms']:>9.2f}"
+                f"{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+                f"{row['throughput_rps']:>9.0f}"
+                f"{row['queries_per_request']:>7.1f}"
+            )
+        print(
+            f"Режим {report['mode']}, одновременно {report['concurrency']}, "
+            f"JSON: {report.get('json_backend', json_backend())}. "
+            f"Всего {report['requests']} запросов за {report['seconds']} с, "
+            f"{report['throughput_rps']} запросов/с."
+        )
@@ -0,0 +1,58 @@
+import psycopg2
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+COMMANDS = ("SHOW POOLS", "SHOW STATS")
+
+
+class Command(BaseCommand):
+    """Статистика пулов pgbouncer для подбора размеров пула."""
+
+    help = (
+        "Выводит SHOW POOLS и SHOW STATS из консоли администратора "
+        "pgbouncer, к которому подключено приложение."
+    )
+
+    def add_arguments(self, parser):
+        database = settings.DATABASES["default"]
+        parser.add_argument("--host", default=database["HOST"])
+        parser.add_argument("--port", default=database["PORT"])
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES["default"]
+        try:
+            connection = psycopg2.connect(
+                dbname="pgbouncer",
+                user=database["USER"],
+                password=database["PASSWORD"],
+                host=options["host"],
+                port=options["port"],
+            )
+        except psycopg2.Error as error:
+            raise CommandError(f"Нет подключения к pgbouncer: {error}")
+        # Консоль pgbouncer не поддерживает транзакции.
+        connection.autocommit = True
+        try:
+            with connection.cursor() as cursor:
+                for command in COMMANDS:
+                    cursor.execute(command)
+                    self.print_table(
+                        command,
+                        [column.name for column in cursor.description],
+                        cursor.fetchall(),
+                    )
+        finally:
+            connection.close()
+
+    @staticmethod
+    def print_table(title, columns, rows):
+        print(title)
+        widths = [
+            max([len(str(column))] + [len(str(row[i])) for row in rows])
+            for i, column in enumerate(columns)
+        ]
+        for row in [columns] + rows:
+            print("  ".join(
+                str(value).ljust(width) for value, width in zip(row, widths)
+            ))
+        print()
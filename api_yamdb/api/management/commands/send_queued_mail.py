@@ -0,0 +1,55 @@
+import time
+
+from api.outbox import DEFAULT_BATCH_SIZE, purge_sent, send_batch
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+from prometheus_client import start_http_server
+
+
+class Command(BaseCommand):
+    """Отправка писем из очереди OutgoingEmail и удаление старых
+    отправленных писем."""
+
+    help = "Отправляет письма из очереди пачками через одно соединение."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Работать постоянно, проверяя очередь каждые --interval с.",
+        )
+        parser.add_argument("--interval", type=float, default=2)
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            help="Порт HTTP-сервера с метриками отправки писем.",
+        )
+
+    def handle(self, *args, **options):
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
+        while True:
+            sent, failed = self.drain(options["batch_size"])
+            if sent or failed:
+                print(f"Отправлено: {sent}, ошибок: {failed}")
+            purged = purge_sent()
+            if purged:
+                print(f"Удалено отправленных писем: {purged}")
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
+
+    @staticmethod
+    def drain(batch_size):
+        """Отправляет пачки, пока очередь не опустеет."""
+        sent_total = failed_total = 0
+        while True:
+            sent, failed = send_batch(batch_size)
+            sent_total += sent
+            failed_total += failed
+            if sent + failed < batch_size:
+                return sent_total, failed_total
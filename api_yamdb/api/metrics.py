@@ -0,0 +1,141 @@
+import os
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+
+from .middleware import ProfiledMiddleware
+
+# Метрики пишутся в mmap-файлы каталога PROMETHEUS_MULTIPROC_DIR, если он
+# задан (gunicorn.conf.py), поэтому /metrics любого воркера gunicorn
+# отдает сумму по всем. Метрики без меток создают файл при импорте,
+# так что каталог нужен до их объявления в любом процессе.
+MULTIPROCESS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+MULTIPROCESS = bool(MULTIPROCESS_DIR)
+if MULTIPROCESS:
+    os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+REQUESTS = Counter(
+    "yamdb_http_requests_total",
+    "Количество HTTP-запросов.",
+    ["route", "method", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "yamdb_http_request_duration_seconds",
+    "Время обработки HTTP-запроса.",
+    ["route", "method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERIES = Histogram(
+    "yamdb_db_queries_per_request",
+    "Количество SQL-запросов на один HTTP-запрос.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_TIME = Histogram(
+    "yamdb_db_duration_seconds_per_request",
+    "Суммарное время SQL-запросов одного HTTP-запроса.",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+DB_CONNECTIONS = Counter(
+    "yamdb_db_connections_opened_total",
+    "Количество открытых соединений с БД.",
+    ["alias"],
+)
+DB_CONNECTION_REUSES = Counter(
+    "yamdb_db_connection_reuses_total",
+    "Запросы, обслуженные уже открытым соединением с БД.",
+    ["alias"],
+)
+DB_HEALTH_CHECK_FAILURES = Counter(
+    "yamdb_db_health_check_failures_total",
+    "Постоянные соединения, закрытые после неудачной проверки.",
+    ["alias"],
+)
+RESPONSE_CACHE = Counter(
+    "yamdb_response_cache_total",
+    "Обращения к кэшу ответов: hit, miss, not_modified, bypass.",
+    ["result"],
+)
+MAIL_SEND = Histogram(
+    "yamdb_mail_send_duration_seconds",
+    "Время отправки письма с кодом подтверждения.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+MAIL_ERRORS = Counter(
+    "yamdb_mail_send_errors_total", "Количество ошибок отправки писем."
+)
+
+
+def count_connection(sender, connection, **kwargs):
+    DB_CONNECTIONS.labels(connection.alias).inc()
+
+
+connection_created.connect(count_connection)
+
+
+def route_name(request):
+    """Имя маршрута из urls.py, например titles-list. Для адресов без
+    маршрута - unresolved, чтобы число меток было ограничено."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name
+
+
+class MetricsMiddleware(ProfiledMiddleware):
+    """Считает запросы, время ответа и работу с БД по маршрутам.
+    Включается настройкой METRICS_ENABLED."""
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def finish(self, request, response, profile):
+        route = route_name(request)
+        REQUESTS.labels(route, request.method, response.status_code).inc()
+        REQUEST_LATENCY.labels(route, request.method).observe(
+            profile.elapsed
+        )
+        DB_QUERIES.labels(route).observe(profile.db_count)
+        DB_TIME.labels(route).observe(profile.db_time)
+        return response
+
+
+def observe_mail_send(func):
+    """Декоратор: время и ошибки отправки писем."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            MAIL_ERRORS.inc()
+            raise
+        finally:
+            MAIL_SEND.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+def metrics_view(request):
+    """Метрики в текстовом формате Prometheus."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(
+        generate_latest(registry), content_type=CONTENT_TYPE_LATEST
+    )
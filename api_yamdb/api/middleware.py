@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .profiling import (RequestProfile, histogram, install_serializer_timer,
+                        profile_request)
+
+logger = logging.getLogger("api.profiling")
+
+
+def view_name(view_func, method):
+    """Имя для статистики: класс вьюсета и действие, например
+    TitleViewSet.list, или имя функции-представления."""
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        return getattr(view_func, "__name__", repr(view_func))
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return f"{cls.__name__}.{action}"
+
+
+class ProfiledMiddleware:
+    """Основа middleware, которые собирают RequestProfile запроса.
+    Работает и под WSGI, и под ASGI без переноса в другой поток:
+    finish() не обращается к БД."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так Django определяет асинхронный middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with profile_request(RequestProfile()) as profile:
+            response = self.get_response(request)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        with profile_request(RequestProfile()) as profile:
+            response = await self.get_response(request)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        """Обрабатывает профиль завершенного запроса. По умолчанию
+        ответ возвращается без изменений."""
+        return response
+
+
+class RequestProfilingMiddleware(ProfiledMiddleware):
+    """Измеряет время запроса, число и время SQL-запросов и время
+    сериализации. Результат добавляется в заголовок Server-Timing,
+    пишется в лог api.profiling и копится в гистограмме по
+    представлениям. Включается настройкой REQUEST_PROFILING, только
+    тогда сериализаторы DRF оборачиваются замером времени."""
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        install_serializer_timer()
+        super().__init__(get_response)
+
+    def finish(self, request, response, profile):
+        elapsed = profile.elapsed
+        name = "unresolved"
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            name = view_name(match.func, request.method)
+        histogram.observe(name, profile, elapsed)
+        response["Server-Timing"] = self.server_timing(profile, elapsed)
+        self.log(request, response, name, profile, elapsed)
+        return response
+
+    @staticmethod
+    def server_timing(profile, elapsed):
+        return ", ".join(
+            (
+                f'db;dur={profile.db_time * 1000:.2f};'
+                f'desc="{profile.db_count} queries"',
+                f"serializer;dur={profile.serializer_time * 1000:.2f}",
+                f"total;dur={elapsed * 1000:.2f}",
+            )
+        )
+
+    @staticmethod
+    def log(request, response, name, profile, elapsed):
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        record = {
+            "view": name,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "ms": round(elapsed * 1000, 3),
+            "db_queries": profile.db_count,
+            "db_ms": round(profile.db_time * 1000, 3),
+            "serializer_ms": round(profile.serializer_time * 1000, 3),
+        }
+        if elapsed * 1000 >= settings.REQUEST_PROFILING_SLOW_MS:
+            record["slowest_sql"] = profile.slowest_queries()
+        logger.info(json.dumps(record, ensure_ascii=False))
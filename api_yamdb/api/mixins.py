@@ -1,4 +1,6 @@
+from django.conf import settings
 from rest_framework import filters, mixins, viewsets
+from users.models import User
 
 from .permissions import IsAdminModeratorOwnerOrReadOnly
 
@@ -16,3 +18,104 @@ class CreateListDestroyViewSet(
     filter_backends = (filters.SearchFilter,)  # not forget to fix it
     search_fields = ("name",)
     lookup_field = "slug"
+
+
+class AuthorNamesMixin:
+    """Передает сериализатору имена авторов всех объектов страницы,
+    загруженные одним запросом, вместо запроса на каждый объект."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if serializer.instance is not None:
+            objects = serializer.instance
+            if not kwargs.get("many"):
+                objects = [objects]
+            serializer.context["author_names"] = self.get_author_names(
+                {obj.author_id for obj in objects}
+            )
+        return serializer
+
+    def get_author_names(self, ids):
+        """Имя текущего пользователя уже известно из запроса."""
+        ids = set(ids) - {self.request.user.pk}
+        if not ids:
+            return {}
+        return dict(
+            User.objects.filter(pk__in=ids).values_list("pk", "username")
+        )
+
+
+class SparseQuerysetMixin:
+    """Для list и retrieve загружает из БД только поля модели, нужные
+    полям ответа, выбранным параметрами fields и omit."""
+
+    # Поля модели, которые нужны всегда: ключ, поля сортировки страницы
+    # и внешние ключи, по которым работают права и связанные объекты.
+    required_fields = ("id",)
+    # Поле ответа -> поля модели. Поля ответа без записи совпадают с
+    # полем модели, пустой кортеж - поле не читает модель.
+    field_sources = {}
+
+    def selected_fields(self):
+        return self.get_serializer_class().selected_fields(self.request)
+
+    def narrow_queryset(self, queryset):
+        if self.action not in ("list", "retrieve"):
+            return queryset
+        only = set(self.required_fields)
+        for name in self.selected_fields():
+            only.update(self.field_sources.get(name, (name,)))
+        return queryset.only(*only)
+
+
+class ValuesListMixin:
+    """Быстрый путь list: строки страницы выбираются через .values() и
+    превращаются в словари ответа без полей DRF. Ответ совпадает с
+    ответом сериализатора. Включается настройкой VALUES_LIST_FAST_PATH.
+
+    Поля ответа берутся из одноименных полей модели или из выражений
+    values_sources, значения преобразуются функциями values_converters,
+    username авторов загружаются одним запросом (AuthorNamesMixin)."""
+
+    values_sources = {}
+    values_converters = {}
+
+    def list(self, request, *args, **kwargs):
+        if not settings.VALUES_LIST_FAST_PATH:
+            return super().list(request, *args, **kwargs)
+        fields = {
+            name: self.values_sources.get(name, name)
+            for name in self.selected_fields()
+        }
+        keys = {field.lstrip("-") for field in self.paginator.ordering}
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(
+            queryset.values(*keys.union(fields.values()))
+        )
+        return self.get_paginated_response(self.represent_rows(page, fields))
+
+    def represent_rows(self, rows, fields):
+        converters = {
+            name: convert
+            for name, convert in self.values_converters.items()
+            if name in fields
+        }
+        if "author" in fields:
+            converters["author"] = self.author_names(
+                row[fields["author"]] for row in rows
+            ).get
+        return [
+            {
+                name: converters[name](row[source])
+                if name in converters else row[source]
+                for name, source in fields.items()
+            }
+            for row in rows
+        ]
+
+    def author_names(self, ids):
+        names = self.get_author_names(ids)
+        user = self.request.user
+        if user.is_authenticated:
+            names[user.pk] = user.username
+        return names
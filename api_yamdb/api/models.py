@@ -0,0 +1,45 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку. Запрос только добавляет запись,
+    отправляет письма команда send_queued_mail."""
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "В очереди"),
+        (SENT, "Отправлено"),
+        (FAILED, "Ошибка"),
+    ]
+
+    subject = models.CharField("Тема", max_length=256)
+    body = models.TextField("Текст")
+    from_email = models.EmailField("Отправитель", max_length=250)
+    to = models.EmailField("Получатель", max_length=250)
+    status = models.CharField(
+        "Статус", max_length=16, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField("Попыток", default=0)
+    next_attempt_at = models.DateTimeField(
+        "Следующая попытка", default=timezone.now
+    )
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created = models.DateTimeField("Создано", auto_now_add=True)
+    sent_at = models.DateTimeField("Отправлено", null=True, blank=True)
+
+    class Meta:
+        ordering = ("next_attempt_at", "id")
+        verbose_name = "Исходящее письмо"
+        verbose_name_plural = "Исходящие письма"
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="outgoing_email_queue_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.to}: {self.subject}"
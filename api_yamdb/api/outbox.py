@@ -0,0 +1,113 @@
+import random
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .metrics import observe_mail_send
+from .models import OutgoingEmail
+
+DEFAULT_BATCH_SIZE = 50
+MAX_ATTEMPTS = 6
+# Задержка перед повторной попыткой: 30 с, 1 мин, 2 мин ... не больше часа.
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 3600
+# Взятые в работу письма откладываются на это время, чтобы другой
+# воркер не отправил их повторно. Если воркер упадет, письма вернутся
+# в очередь после истечения срока.
+LEASE = timedelta(minutes=5)
+# Отправленные письма удаляются через сутки: в их тексте коды
+# подтверждения.
+SENT_RETENTION = timedelta(days=1)
+
+
+def enqueue(subject, body, from_email, to):
+    return OutgoingEmail.objects.create(
+        subject=subject, body=body, from_email=from_email, to=to
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка со случайным разбросом, чтобы повторные
+    попытки не приходили на почтовый сервер одновременно."""
+    delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """Забирает из очереди письма, срок отправки которых наступил.
+    На PostgreSQL занятые другим воркером строки пропускаются."""
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutgoingEmail.PENDING, next_attempt_at__lte=now)
+            .values_list("id", flat=True)[:batch_size]
+        )
+        OutgoingEmail.objects.filter(id__in=ids).update(
+            attempts=F("attempts") + 1, next_attempt_at=now + LEASE
+        )
+    return list(OutgoingEmail.objects.filter(id__in=ids))
+
+
+@observe_mail_send
+def send_one(email, connection):
+    EmailMessage(
+        email.subject,
+        email.body,
+        email.from_email,
+        [email.to],
+        connection=connection,
+    ).send()
+
+
+def mark_failed(email, error):
+    email.last_error = str(error)
+    if email.attempts >= MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=["status", "next_attempt_at", "last_error"])
+
+
+def send_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """Отправляет пачку писем через одно соединение с почтовым сервером.
+    Возвращает количество отправленных и неудачных писем."""
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+    sent = []
+    failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        return 0, len(emails)
+    try:
+        for email in emails:
+            try:
+                send_one(email, connection)
+            except Exception as error:
+                failed += 1
+                mark_failed(email, error)
+            else:
+                sent.append(email.id)
+    finally:
+        connection.close()
+    OutgoingEmail.objects.filter(id__in=sent).update(
+        status=OutgoingEmail.SENT, sent_at=timezone.now(), last_error=""
+    )
+    return len(sent), failed
+
+
+def purge_sent(retention=SENT_RETENTION):
+    """Удаляет письма, отправленные раньше чем retention назад.
+    Возвращает количество удаленных писем."""
+    deleted, _ = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.SENT, sent_at__lt=timezone.now() - retention
+    ).delete()
+    return deleted
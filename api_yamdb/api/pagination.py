@@ -0,0 +1,245 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from operator import attrgetter
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по ключу (keyset/cursor) без OFFSET.
+
+    Страница выбирается условием на значения полей сортировки последней
+    записи предыдущей страницы, поэтому стоимость запроса не зависит от
+    номера страницы. Последнее поле ordering должно быть уникальным,
+    оно разрешает равенство остальных полей. Количество записей
+    считается, только если не передан параметр count=false."""
+
+    ordering = ("-pk",)
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    count_query_param = "count"
+    invalid_cursor_message = "Неверный курсор"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_with_count(self, request):
+        value = request.query_params.get(self.count_query_param, "true")
+        return value.lower() not in ("0", "false", "no")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            values, reverse = cursor["v"], bool(cursor["r"])
+        except (
+            binascii.Error, ValueError, TypeError, KeyError, AttributeError
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    @staticmethod
+    def ordering_field(queryset, name):
+        """Поле модели или аннотация, по которой идет сортировка."""
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        model = queryset.model
+        field = None
+        for part in name.split("__"):
+            field = (
+                model._meta.pk if part == "pk" else model._meta.get_field(part)
+            )
+            model = field.related_model
+        return field
+
+    def clean_cursor(self, queryset, values):
+        """Приводит значения курсора к типам полей сортировки."""
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        cleaned = []
+        for field, value in zip(self.ordering, values):
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                cleaned.append(
+                    self.ordering_field(
+                        queryset, field.lstrip("-")
+                    ).to_python(value)
+                )
+            except (ValueError, TypeError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return cleaned
+
+    def encode_cursor(self, instance, reverse):
+        values = []
+        for field in self.ordering:
+            name = field.lstrip("-")
+            if isinstance(instance, dict):
+                # Строка из .values() (ValuesListMixin).
+                value = instance[name]
+            else:
+                value = attrgetter(name)(instance)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            values.append(value)
+        cursor = json.dumps({"v": values, "r": int(reverse)})
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def keyset_filter(self, values, reverse):
+        """Условие "запись идет после values" в порядке ordering
+        (или перед values, если reverse)."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip("-")
+            descending = field.startswith("-") != reverse
+            lookup = "lt" if descending else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_ordering(self, queryset):
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = self.get_ordering(queryset)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.count = queryset.count() if self.get_with_count(request) else None
+        values, reverse = self.decode_cursor(request)
+        if values is not None:
+            values = self.clean_cursor(queryset, values)
+        ordering = self.ordering
+        if reverse:
+            ordering = [
+                field[1:] if field.startswith("-") else "-" + field
+                for field in ordering
+            ]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.keyset_filter(values, reverse))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next = values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+        self.page = results
+        return results
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.base_url, self.cursor_query_param
+            )
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        response = {}
+        if self.count is not None:
+            response["count"] = self.count
+        response.update(
+            next=self.get_next_link(),
+            previous=self.get_previous_link(),
+            results=data,
+        )
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer", "example": 123},
+                "next": {"type": "string", "nullable": True},
+                "previous": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Курсор страницы из ссылок next/previous.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    f"Количество записей на странице, не более "
+                    f"{self.max_page_size}."
+                ),
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "false - не считать общее количество.",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+
+class PubDatePagination(KeysetPagination):
+    """Отзывы и комментарии: сначала новые."""
+
+    ordering = ("-pub_date", "-id")
+
+
+class TitlePagination(KeysetPagination):
+    """Произведения в порядке модели: по убыванию года, затем по
+    названию, или по релевантности при поиске."""
+
+    ordering = ("-year", "name", "id")
+
+    def get_ordering(self, queryset):
+        """Результаты поиска выводятся по убыванию релевантности."""
+        if "search_rank" in queryset.query.annotations:
+            return ("-search_rank", "id")
+        return self.ordering
+
+
+class LeaderboardPagination(KeysetPagination):
+    """Места в рейтинге по порядку."""
+
+    ordering = ("position",)
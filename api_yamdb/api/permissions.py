@@ -30,7 +30,7 @@ class IsAdminModeratorOwnerOrReadOnly(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or request.user.is_admin
             or request.user.is_moderator
-            or request.user == obj.author
+            or obj.author_id == request.user.pk
         )
 
 
@@ -42,7 +42,7 @@ class IsUserOwner(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return (request.user.is_authenticated
-                and obj.author == request.user
+                and obj.author_id == request.user.pk
                 )
 
 
@@ -0,0 +1,195 @@
+import bisect
+import heapq
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from rest_framework import serializers
+
+# Границы корзин гистограммы времени ответа, мс.
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+# Сколько самых медленных SQL-запросов запоминать для одного запроса.
+SLOWEST_QUERIES = 3
+SQL_MAX_LENGTH = 500
+
+# Профили текущего HTTP-запроса. Переменная контекста видна и в потоках,
+# куда asgiref переносит синхронный код асинхронных представлений.
+request_profiles = ContextVar("request_profiles", default=())
+serializer_depth = ContextVar("serializer_depth", default=0)
+
+
+class RequestProfile:
+    """Измерения одного HTTP-запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.slowest = []
+
+    def add_query(self, sql, duration):
+        self.db_count += 1
+        self.db_time += duration
+        item = (duration, self.db_count, sql)
+        if len(self.slowest) < SLOWEST_QUERIES:
+            heapq.heappush(self.slowest, item)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, item)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def slowest_queries(self):
+        return [
+            {"ms": round(duration * 1000, 3), "sql": sql[:SQL_MAX_LENGTH]}
+            for duration, _, sql in sorted(self.slowest, reverse=True)
+        ]
+
+
+@contextmanager
+def profile_request(profile):
+    """Учитывать запросы к БД и сериализацию в profile."""
+    token = request_profiles.set(request_profiles.get() + (profile,))
+    try:
+        yield profile
+    finally:
+        request_profiles.reset(token)
+
+
+class QueryTimer:
+    """Обертка connection.execute_wrapper: считает запросы к БД и их
+    время в профилях текущего HTTP-запроса без сохранения всего журнала,
+    как делает DEBUG. Вне запроса только передает вызов дальше."""
+
+    def __call__(self, execute, sql, params, many, context):
+        profiles = request_profiles.get()
+        if not profiles:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            for profile in profiles:
+                profile.add_query(sql, duration)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """Ставит QueryTimer на соединение при его открытии, в каком бы
+    потоке оно ни было создано."""
+    if not any(
+        isinstance(wrapper, QueryTimer)
+        for wrapper in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(QueryTimer())
+
+
+def timed_representation(to_representation):
+    """Обертка to_representation: время сериализации учитывается в
+    профилях текущего запроса. Вложенные сериализаторы и элементы
+    списка не считаются повторно."""
+
+    @wraps(to_representation)
+    def wrapper(self, instance):
+        profiles = request_profiles.get()
+        if not profiles or serializer_depth.get():
+            return to_representation(self, instance)
+        token = serializer_depth.set(1)
+        started = time.perf_counter()
+        try:
+            return to_representation(self, instance)
+        finally:
+            serializer_depth.reset(token)
+            duration = time.perf_counter() - started
+            for profile in profiles:
+                profile.serializer_time += duration
+
+    wrapper.timed = True
+    return wrapper
+
+
+def install_serializer_timer():
+    """Включает учет времени сериализации для всех сериализаторов DRF.
+    Без профилирования сериализаторы работают без обертки."""
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        if not getattr(cls.to_representation, "timed", False):
+            cls.to_representation = timed_representation(
+                cls.to_representation
+            )
+
+
+class ViewHistogram:
+    """Гистограмма времени ответа и нагрузки на БД по представлениям,
+    общая для всех потоков процесса."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, profile, elapsed):
+        milliseconds = elapsed * 1000
+        index = bisect.bisect_left(self.buckets, milliseconds)
+        slowest = profile.slowest_queries()[:1]
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = {
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "db_queries": 0,
+                    "db_ms": 0.0,
+                    "serializer_ms": 0.0,
+                    "buckets": [0] * (len(self.buckets) + 1),
+                    "slowest_sql": None,
+                }
+            stats["count"] += 1
+            stats["total_ms"] += milliseconds
+            stats["max_ms"] = max(stats["max_ms"], milliseconds)
+            stats["db_queries"] += profile.db_count
+            stats["db_ms"] += profile.db_time * 1000
+            stats["serializer_ms"] += profile.serializer_time * 1000
+            stats["buckets"][index] += 1
+            if slowest and (
+                stats["slowest_sql"] is None
+                or slowest[0]["ms"] > stats["slowest_sql"]["ms"]
+            ):
+                stats["slowest_sql"] = slowest[0]
+
+    def snapshot(self):
+        with self.lock:
+            views = {
+                view: dict(stats, buckets=list(stats["buckets"]))
+                for view, stats in self.views.items()
+            }
+        labels = [f"le_{bound}" for bound in self.buckets] + ["inf"]
+        result = {}
+        for view, stats in sorted(views.items()):
+            count = stats["count"]
+            result[view] = {
+                "count": count,
+                "mean_ms": round(stats["total_ms"] / count, 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "db_queries_per_request": round(
+                    stats["db_queries"] / count, 2
+                ),
+                "db_ms_per_request": round(stats["db_ms"] / count, 3),
+                "serializer_ms_per_request": round(
+                    stats["serializer_ms"] / count, 3
+                ),
+                "histogram_ms": dict(zip(labels, stats["buckets"])),
+                "slowest_sql": stats["slowest_sql"],
+            }
+        return result
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+histogram = ViewHistogram()
@@ -0,0 +1,82 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ORJSON = "orjson"
+STDLIB = "stdlib"
+JSON_BACKENDS = (ORJSON, STDLIB)
+
+if orjson is not None:
+    # Даты и время форматирует JSONEncoder DRF, как в JSONRenderer.
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    ORJSON_ERRORS = (orjson.JSONEncodeError,)
+else:
+    ORJSON_OPTIONS = 0
+    ORJSON_ERRORS = ()
+
+encode_default = JSONEncoder().default
+
+
+def json_backend():
+    """Модуль JSON для текущих настроек: orjson, если он установлен и
+    выбран настройкой JSON_BACKEND, иначе stdlib."""
+    if orjson is not None and settings.JSON_BACKEND == ORJSON:
+        return ORJSON
+    return STDLIB
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson. Типы, которых orjson не знает (Decimal,
+    ленивые строки переводов, даты и время в формате DRF), преобразует
+    JSONEncoder DRF, поэтому ответ совпадает с ответом JSONRenderer.
+    Ответы с отступами и ответы, которые orjson не смог закодировать,
+    отрисовывает JSONRenderer."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or json_backend() != ORJSON
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        try:
+            ret = orjson.dumps(
+                data, default=encode_default, option=ORJSON_OPTIONS
+            )
+        except ORJSON_ERRORS:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+        # Как в JSONRenderer: U+2028 и U+2029 недопустимы в JavaScript.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson для тел запросов в UTF-8."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get(
+            "encoding", settings.DEFAULT_CHARSET
+        )
+        if (
+            json_backend() != ORJSON
+            or encoding.lower().replace("-", "") != "utf8"
+        ):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
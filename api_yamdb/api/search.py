@@ -0,0 +1,98 @@
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import BooleanField, Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from reviews.models import Title
+
+from .cache import TITLES, get_versions
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """Инвертированный индекс произведений в памяти процесса.
+    Используется вместо полнотекстового поиска PostgreSQL на других
+    базах данных (SQLite в тестах). Перестраивается при изменении
+    версии ресурса произведений."""
+
+    def __init__(self):
+        self.version = None
+        self.postings = {}
+        self._lock = threading.Lock()
+
+    def build(self):
+        postings = defaultdict(lambda: defaultdict(int))
+        titles = Title.objects.values_list("id", "name", "description")
+        for pk, name, description in titles.iterator():
+            for token in tokenize(f"{name} {description}"):
+                postings[token][pk] += 1
+        return dict(postings)
+
+    def get_postings(self):
+        version = get_versions((TITLES,))
+        with self._lock:
+            if version != self.version:
+                self.postings = self.build()
+                self.version = version
+            return self.postings
+
+    def search(self, query):
+        """Словарь {id произведения: релевантность}. Слово запроса
+        совпадает со всеми словами индекса, которые с него начинаются."""
+        postings = self.get_postings()
+        scores = defaultdict(float)
+        for term in tokenize(query):
+            for token, documents in postings.items():
+                if not token.startswith(term):
+                    continue
+                weight = len(term) / len(token)
+                for pk, count in documents.items():
+                    scores[pk] += weight * count
+        return scores
+
+
+inverted_index = InvertedIndex()
+
+
+def search_titles(queryset, query):
+    """Отбирает произведения по поисковому запросу и добавляет к ним
+    аннотацию search_rank (чем больше, тем релевантнее)."""
+    if not tokenize(query):
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        return search_titles_postgresql(queryset, query)
+    scores = inverted_index.search(query)
+    if not scores:
+        return queryset.none()
+    return queryset.filter(pk__in=scores).annotate(
+        search_rank=Case(
+            *(When(pk=pk, then=Value(score)) for pk, score in scores.items()),
+            output_field=FloatField(),
+        )
+    )
+
+
+def search_titles_postgresql(queryset, query):
+    """Полнотекстовый поиск по search_vector и нечеткий триграммный поиск
+    по названию. Оба условия обслуживаются GIN-индексами."""
+    table = Title._meta.db_table
+    tsquery = "plainto_tsquery('simple', %s)"
+    rank = RawSQL(
+        f"(ts_rank({table}.search_vector, {tsquery}) "
+        f"+ similarity({table}.name, %s))::float8",
+        (query, query),
+        output_field=FloatField(),
+    )
+    matches = RawSQL(
+        f"{table}.search_vector @@ {tsquery} OR {table}.name %% %s",
+        (query, query),
+        output_field=BooleanField(),
+    )
+    return queryset.annotate(search_rank=rank).filter(matches)
@@ -3,21 +3,83 @@ from django.core.validators import MaxLengthValidator, RegexValidator
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.validators import UniqueValidator
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import (Category, Comment, Genre, LeaderboardEntry, Review,
+                            Title)
 from users.models import User
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """Выбор полей ответа на GET-запрос параметрами fields и omit.
+
+    ?fields=id,name - только перечисленные поля, ?omit=description - все
+    поля, кроме перечисленных. Поля из Meta.optional_fields по умолчанию
+    не выводятся и добавляются, если перечислены в fields:
+    ?fields=score_counts добавляет распределение оценок к обычным полям.
+    Неизвестные имена полей пропускаются."""
+
+    @staticmethod
+    def query_names(request, param):
+        value = request.query_params.get(param, "")
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    @classmethod
+    def selected_fields(cls, request):
+        """Имена выводимых полей в порядке Meta.fields."""
+        names = cls.Meta.fields
+        optional = set(getattr(cls.Meta, "optional_fields", ()))
+        if request is None or request.method not in SAFE_METHODS:
+            return [name for name in names if name not in optional]
+        requested = cls.query_names(request, "fields") & set(names)
+        omitted = cls.query_names(request, "omit")
+        if requested - optional:
+            selected = [name for name in names if name in requested]
+        else:
+            selected = [
+                name for name in names
+                if name not in optional or name in requested
+            ]
+        return [name for name in selected if name not in omitted]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = set(self.selected_fields(self.context.get("request")))
+        return {
+            name: field for name, field in fields.items()
+            if name in selected
+        }
+
+
+class AuthorField(serializers.Field):
+    """username автора по author_id без загрузки автора: из карты
+    author_names в контексте (AuthorNamesMixin) или из запроса, если
+    автор - текущий пользователь."""
+
+    def __init__(self, **kwargs):
+        kwargs.update(source="author_id", read_only=True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, author_id):
+        names = self.context.get("author_names") or {}
+        if author_id in names:
+            return names[author_id]
+        request = self.context.get("request")
+        if request is not None and request.user.pk == author_id:
+            return request.user.username
+        return (
+            User.objects.filter(pk=author_id)
+            .values_list("username", flat=True)
+            .first()
+        )
+
+
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     title = serializers.SlugRelatedField(
         slug_field="name",
         read_only=True,
     )
-    author = serializers.SlugRelatedField(
-        default=serializers.CurrentUserDefault(),
-        slug_field="username",
-        read_only=True,
-    )
+    author = AuthorField()
 
     def validate(self, data):
         request = self.context["request"]
@@ -25,7 +87,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         title_id = self.context["view"].kwargs.get("title_id")
         if request.method == "POST":
             if Review.objects.filter(
-                title_id=title_id, author=author
+                title_id=title_id, author_id=author.pk
             ).exists():
                 raise ValidationError(
                     "Вы не можете добавить более"
@@ -35,18 +97,16 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = "__all__"
+        fields = ("id", "title", "author", "text", "score", "pub_date")
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     review = serializers.SlugRelatedField(slug_field="text", read_only=True)
-    author = serializers.SlugRelatedField(
-        slug_field="username", read_only=True
-    )
+    author = AuthorField()
 
     class Meta:
         model = Comment
-        fields = "__all__"
+        fields = ("id", "review", "author", "text", "pub_date")
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -65,12 +125,14 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ("id",)
 
 
-class TitleGETSerializer(serializers.ModelSerializer):
-    """Сериализатор объектов класса Title при GET запросах."""
+class TitleGETSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Сериализатор объектов класса Title при GET запросах.
+    Статистика оценок выводится по запросу: ?fields=score_counts."""
 
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
     rating = serializers.IntegerField(read_only=True)
+    median_score = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
@@ -82,7 +144,11 @@ class TitleGETSerializer(serializers.ModelSerializer):
             "description",
             "genre",
             "category",
+            "reviews_count",
+            "score_counts",
+            "median_score",
         )
+        optional_fields = ("reviews_count", "score_counts", "median_score")
 
 
 class TitleSerializer(serializers.ModelSerializer):
@@ -108,10 +174,55 @@ class TitleSerializer(serializers.ModelSerializer):
 
     def to_representation(self, title):
         """Определяет какой сериализатор будет использоваться для чтения."""
-        serializer = TitleGETSerializer(title)
+        serializer = TitleGETSerializer(title, context=self.context)
         return serializer.data
 
 
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Место произведения в рейтинге."""
+
+    title = TitleGETSerializer(read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ("position", "score", "title")
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    """Элемент массового создания произведений. Жанры и категория
+    проверяются по справочникам, загруженным на весь массив."""
+
+    genre = serializers.ListField(
+        child=serializers.SlugField(), allow_empty=False
+    )
+    category = serializers.SlugField()
+
+    class Meta:
+        model = Title
+        fields = ("name", "year", "description", "genre", "category")
+
+
+class ReviewBulkSerializer(serializers.ModelSerializer):
+    """Элемент массового создания отзывов: id произведения, текст
+    и оценка."""
+
+    title = serializers.IntegerField()
+
+    class Meta:
+        model = Review
+        fields = ("title", "text", "score")
+
+
+class CommentBulkSerializer(serializers.ModelSerializer):
+    """Элемент массового создания комментариев: id отзыва и текст."""
+
+    review = serializers.IntegerField()
+
+    class Meta:
+        model = Comment
+        fields = ("review", "text")
+
+
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(
         validators=[
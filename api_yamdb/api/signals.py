@@ -0,0 +1,54 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+from .authentication import forget_user_state
+from .cache import (CATEGORIES, COMMENTS, GENRES, REVIEWS, TITLES, USERS,
+                    bump_version)
+
+MODEL_RESOURCES = {
+    Title: TITLES,
+    GenreTitle: TITLES,
+    Genre: GENRES,
+    Category: CATEGORIES,
+    Review: REVIEWS,
+    Comment: COMMENTS,
+}
+
+
+def invalidate(resource, **kwargs):
+    """Меняет версию ресурса после фиксации транзакции, чтобы в кэш
+    не попали данные, прочитанные до коммита."""
+    transaction.on_commit(partial(bump_version, resource))
+
+
+def invalidate_users(sender, created=False, **kwargs):
+    # Новый пользователь еще не встречается в отзывах и комментариях.
+    if not created:
+        invalidate(USERS)
+
+
+def invalidate_user_state(sender, instance, **kwargs):
+    """Смена роли, блокировка или удаление пользователя действуют на уже
+    выданные токены."""
+    transaction.on_commit(partial(forget_user_state, instance.pk))
+
+
+def invalidate_title_genres(sender, action, **kwargs):
+    if action.startswith("post_"):
+        invalidate(TITLES)
+
+
+for model, resource in MODEL_RESOURCES.items():
+    receiver = partial(invalidate, resource)
+    post_save.connect(receiver, sender=model, weak=False)
+    post_delete.connect(receiver, sender=model, weak=False)
+
+m2m_changed.connect(invalidate_title_genres, sender=Title.genre.through)
+post_save.connect(invalidate_users, sender=User)
+post_delete.connect(invalidate_users, sender=User)
+post_save.connect(invalidate_user_state, sender=User)
+post_delete.connect(invalidate_user_state, sender=User)
@@ -1,6 +1,9 @@
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet, UserViewSet, get_code,
-                       get_token)
+from api.async_views import async_routes
+from api.views import (CategoryViewSet, CommentBulkView, CommentViewSet,
+                       GenreViewSet, LeaderboardViewSet, ReviewBulkView,
+                       ReviewViewSet, TitleBulkView, TitleViewSet, UserViewSet,
+                       export_table, get_code, get_token, profiling_stats)
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
@@ -17,13 +20,27 @@ router.register("users", UserViewSet, basename="users")
 router.register("categories", CategoryViewSet, basename="categories")
 router.register("genres", GenreViewSet, basename="genres")
 router.register("titles", TitleViewSet, basename="titles")
+router.register(
+    r"leaderboards/(?P<board>best|trending)",
+    LeaderboardViewSet,
+    basename="leaderboards",
+)
 
 auth_urls = [
     path("signup/", get_code),
     path("token/", get_token),
 ]
 
+router_urls = router.urls
+if settings.ASYNC_VIEWS:
+    router_urls = async_routes(router_urls)
+
 urlpatterns = [
     path("v1/auth/", include(auth_urls)),
-    path("v1/", include(router.urls)),
+    path("v1/profiling/", profiling_stats),
+    path("v1/export/<slug:table>.<slug:file_format>", export_table),
+    path("v1/titles/bulk/", TitleBulkView.as_view()),
+    path("v1/reviews/bulk/", ReviewBulkView.as_view()),
+    path("v1/comments/bulk/", CommentBulkView.as_view()),
+    path("v1/", include(router_urls)),
 ]
@@ -1,13 +1,14 @@
 from django.conf import settings
-from django.core.mail import send_mail
+
+from .outbox import enqueue
 
 
 def mail_send(addres, confirmation_code):
-    """Отправка письма с confirmation_code пользователю"""
-    send_mail(
+    """Постановка письма с confirmation_code пользователю в очередь.
+    Отправляет письма команда send_queued_mail."""
+    enqueue(
         "Пароль от YaMDB",
         f"Ваш пароль: {confirmation_code}",
         settings.DEFAULT_FROM_EMAIL,
-        [addres],
-        fail_silently=False,
+        addres,
     )
@@ -1,26 +1,49 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import prefetch_related_objects
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status, viewsets
+from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.fields import DateTimeField
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.exporter import (CONTENT_TYPES, EXPORT_TABLES, FORMATS,
+                              export_lines)
+from reviews.leaderboards import ALL_SCOPE, category_scope, genre_scope
+from reviews.models import (Category, Comment, Genre, GenreTitle,
+                            LeaderboardEntry, Review, Title)
+from reviews.utils import rebuild_title_ratings
 from users.models import User
 
+from .async_views import ThreadIterator
+from .authentication import token_for_user
+from .bulk import BulkCreateView
+from .cache import (CATEGORIES, COMMENTS, GENRES, LEADERBOARDS, REVIEWS,
+                    TITLES, USERS, CachedListMixin, CachedListRetrieveMixin)
+from .db_router import ReplicaReadMixin
 from .filters import TitleFilter
-from .mixins import CreateListDestroyViewSet
+from .mixins import (AuthorNamesMixin, CreateListDestroyViewSet,
+                     SparseQuerysetMixin, ValuesListMixin)
+from .pagination import (LeaderboardPagination, PubDatePagination,
+                         TitlePagination)
 from .permissions import (AdminOnly, AnonimReadOnly,
                           IsAdminModeratorOwnerOrReadOnly, IsAdminOrReadOnly,
                           IsUserOwner)
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, GetTokenSerializer,
-                          ReviewSerializer, TitleGETSerializer,
+from .profiling import histogram
+from .serializers import (CategorySerializer, CommentBulkSerializer,
+                          CommentSerializer, GenreSerializer,
+                          GetTokenSerializer, LeaderboardEntrySerializer,
+                          ReviewBulkSerializer, ReviewSerializer,
+                          TitleBulkSerializer, TitleGETSerializer,
                           TitleSerializer, UserSerializer)
 from .utils import mail_send
 
+format_datetime = DateTimeField().to_representation
+
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -62,7 +85,7 @@ def get_token(request):
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data["username"]
     user = User.objects.get(username=username)
-    token = RefreshToken.for_user(user)
+    token = token_for_user(user)
     message = {
         "refresh": str(token),
         "access": str(token.access_token),
@@ -70,6 +93,36 @@ def get_token(request):
     return Response(message, status=status.HTTP_200_OK)
 
 
+@api_view(["GET", "DELETE"])
+@permission_classes([AdminOnly])
+def profiling_stats(request):
+    """Статистика профилирования запросов по представлениям для текущего
+    процесса. DELETE обнуляет накопленные данные."""
+    if request.method == "DELETE":
+        histogram.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(histogram.snapshot())
+
+
+@api_view(["GET"])
+@permission_classes([AdminOnly])
+def export_table(request, table, file_format):
+    """Потоковая выгрузка таблицы в csv или ndjson, например
+    ../export/titles.csv. Столбцы совпадают с файлами load_csv_data."""
+    if table not in EXPORT_TABLES or file_format not in FORMATS:
+        raise NotFound("Нет такой таблицы или формата выгрузки")
+    lines = export_lines(table, file_format, settings.EXPORT_CHUNK_SIZE)
+    if isinstance(request._request, ASGIRequest):
+        lines = ThreadIterator(lines)
+    response = StreamingHttpResponse(
+        lines, content_type=CONTENT_TYPES[file_format]
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{table}.{file_format}"'
+    )
+    return response
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """Работа администратора с данными пользователей.
     Создание, изменение, удаление. Ссылка ../users/{username}/ - страница
@@ -128,11 +181,9 @@ class UserViewSet(viewsets.ModelViewSet):
     )
     def me(self, request):
         """Получение собственных данных"""
-        serializer = UserSerializer(request.user)
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == "GET":
-            return Response(serializer.data)
-        pk = request.user.pk
-        user = User.objects.get(id=pk)
+            return Response(UserSerializer(user).data)
         serializer = UserSerializer(user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
@@ -143,9 +194,22 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.validated_data)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(
+    ReplicaReadMixin,
+    CachedListRetrieveMixin,
+    ValuesListMixin,
+    SparseQuerysetMixin,
+    AuthorNamesMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = ReviewSerializer
     permission_classes = [IsAdminModeratorOwnerOrReadOnly]
+    pagination_class = PubDatePagination
+    cache_resources = (REVIEWS, TITLES, USERS)
+    required_fields = ("id", "pub_date", "title", "author")
+    field_sources = {"title": (), "author": ()}
+    values_sources = {"title": "title__name", "author": "author_id"}
+    values_converters = {"pub_date": format_datetime}
 
     def get_title(self):
         """Возвращает объект текущего произведения."""
@@ -154,53 +218,100 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        return self.narrow_queryset(title.reviews.all())
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get("title_id")
         title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author_id=self.request.user.pk, title=title)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ReplicaReadMixin,
+    CachedListRetrieveMixin,
+    ValuesListMixin,
+    SparseQuerysetMixin,
+    AuthorNamesMixin,
+    viewsets.ModelViewSet,
+):
     serializer_class = CommentSerializer
     permission_classes = [IsAdminModeratorOwnerOrReadOnly]
+    pagination_class = PubDatePagination
+    cache_resources = (COMMENTS, REVIEWS, USERS)
+    required_fields = ("id", "pub_date", "review", "author")
+    field_sources = {"review": (), "author": ()}
+    values_sources = {"review": "review__text", "author": "author_id"}
+    values_converters = {"pub_date": format_datetime}
 
     def get_queryset(self):
         review = get_object_or_404(Review, pk=self.kwargs.get("review_id"))
-        return review.comments.all()
+        return self.narrow_queryset(review.comments.all())
 
     def perform_create(self, serializer):
         title_id = self.kwargs.get("title_id")
         review_id = self.kwargs.get("review_id")
         review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author_id=self.request.user.pk, review=review)
 
 
-class CategoryViewSet(CreateListDestroyViewSet):
+class CategoryViewSet(
+    ReplicaReadMixin, CachedListMixin, CreateListDestroyViewSet
+):
     """Вьюсет для создания обьектов класса Category."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminOrReadOnly]
+    cache_resources = (CATEGORIES,)
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(
+    ReplicaReadMixin, CachedListMixin, CreateListDestroyViewSet
+):
     """Вьюсет для создания обьектов класса Genre."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     permission_classes = [IsAdminOrReadOnly]
+    cache_resources = (GENRES,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ReplicaReadMixin,
+    CachedListRetrieveMixin,
+    SparseQuerysetMixin,
+    viewsets.ModelViewSet,
+):
     """Вьюсет для создания обьектов класса Title."""
 
-    queryset = Title.objects.annotate(rating=Avg("reviews__score"))
+    queryset = Title.objects.select_related("category").prefetch_related(
+        "genre"
+    )
     serializer_class = TitleSerializer
     permission_classes = [IsAdminOrReadOnly | AnonimReadOnly]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
+    cache_resources = (TITLES, GENRES, CATEGORIES, REVIEWS)
+    required_fields = ("id", "year", "name")
+    field_sources = {
+        "genre": (),
+        "category": ("category__name", "category__slug"),
+        "median_score": ("score_counts",),
+    }
+
+    def get_queryset(self):
+        """Жанры и категория загружаются, только если они есть в
+        ответе."""
+        if self.action not in ("list", "retrieve"):
+            return self.queryset.all()
+        fields = self.selected_fields()
+        queryset = Title.objects.all()
+        if "category" in fields:
+            queryset = queryset.select_related("category")
+        if "genre" in fields:
+            queryset = queryset.prefetch_related("genre")
+        return self.narrow_queryset(queryset)
 
     def get_serializer_class(self):
         """Определяет какой сериализатор будет использоваться
@@ -208,3 +319,169 @@ class TitleViewSet(viewsets.ModelViewSet):
         if self.request.method == "GET":
             return TitleGETSerializer
         return TitleSerializer
+
+
+class LeaderboardViewSet(
+    ReplicaReadMixin,
+    CachedListMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Рейтинги лучших (../leaderboards/best/) и популярных сейчас
+    (../leaderboards/trending/) произведений: всех, одного жанра
+    (?genre=slug) или одной категории (?category=slug). Рейтинги
+    пересобирает команда refresh_leaderboards."""
+
+    serializer_class = LeaderboardEntrySerializer
+    permission_classes = [AllowAny]
+    pagination_class = LeaderboardPagination
+    cache_resources = (LEADERBOARDS, TITLES, GENRES, CATEGORIES)
+
+    def get_scope(self):
+        genre = self.request.query_params.get("genre")
+        category = self.request.query_params.get("category")
+        if genre and category:
+            raise ValidationError("Укажите либо жанр, либо категорию")
+        if genre:
+            return genre_scope(genre)
+        if category:
+            return category_scope(category)
+        return ALL_SCOPE
+
+    def get_queryset(self):
+        return (
+            LeaderboardEntry.objects.filter(
+                board=self.kwargs["board"], scope=self.get_scope()
+            )
+            .select_related("title__category")
+            .prefetch_related("title__genre")
+        )
+
+
+class TitleBulkView(BulkCreateView):
+    """Массовое создание произведений администратором."""
+
+    model = Title
+    item_serializer_class = TitleBulkSerializer
+    output_serializer_class = TitleGETSerializer
+    permission_classes = [IsAdminOrReadOnly]
+    cache_resources = TitleViewSet.cache_resources
+
+    def prefetch(self, items):
+        genres = {slug for item in items for slug in item["genre"]}
+        categories = {item["category"] for item in items}
+        return {
+            "genres": Genre.objects.in_bulk(genres, field_name="slug"),
+            "categories": Category.objects.in_bulk(
+                categories, field_name="slug"
+            ),
+        }
+
+    def build(self, data, lookups):
+        errors = {}
+        category = lookups["categories"].get(data["category"])
+        if category is None:
+            errors["category"] = ["Категория не найдена"]
+        missing = [
+            slug for slug in data["genre"] if slug not in lookups["genres"]
+        ]
+        if missing:
+            errors["genre"] = [f"Жанры не найдены: {', '.join(missing)}"]
+        if errors:
+            raise ValidationError(errors)
+        title = Title(
+            name=data["name"],
+            year=data["year"],
+            description=data.get("description", ""),
+            category=category,
+        )
+        title.bulk_genres = [
+            lookups["genres"][slug] for slug in dict.fromkeys(data["genre"])
+        ]
+        return title
+
+    def after_insert(self, objects, lookups):
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title in objects
+            for genre in title.bulk_genres
+        )
+        prefetch_related_objects(objects, "genre")
+
+
+class ReviewBulkView(BulkCreateView):
+    """Массовое создание отзывов текущего пользователя на разные
+    произведения."""
+
+    model = Review
+    item_serializer_class = ReviewBulkSerializer
+    output_serializer_class = ReviewSerializer
+    permission_classes = [IsAdminModeratorOwnerOrReadOnly]
+    cache_resources = ReviewViewSet.cache_resources
+
+    def prefetch(self, items):
+        title_ids = {item["title"] for item in items}
+        return {
+            "titles": Title.objects.only("id", "name").in_bulk(title_ids),
+            "reviewed": set(
+                Review.objects.filter(
+                    author_id=self.request.user.pk, title_id__in=title_ids
+                ).values_list("title_id", flat=True)
+            ),
+        }
+
+    def build(self, data, lookups):
+        title = lookups["titles"].get(data["title"])
+        if title is None:
+            raise ValidationError({"title": ["Произведение не найдено"]})
+        if title.pk in lookups["reviewed"]:
+            raise ValidationError(
+                "Вы не можете добавить более одного отзыва на произведение"
+            )
+        lookups["reviewed"].add(title.pk)
+        return Review(
+            title=title,
+            author_id=self.request.user.pk,
+            text=data["text"],
+            score=data["score"],
+        )
+
+    def after_insert(self, objects, lookups):
+        """bulk_create не вызывает сигналы, поэтому агрегаты затронутых
+        произведений пересчитываются по таблице отзывов. Строки
+        произведений сначала блокируются, как в update_title_rating:
+        иначе пересчет затер бы изменение агрегатов отзывом,
+        созданным параллельно."""
+        titles = Title.objects.filter(
+            pk__in={obj.title_id for obj in objects}
+        )
+        list(
+            titles.select_for_update()
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        rebuild_title_ratings(titles)
+
+
+class CommentBulkView(BulkCreateView):
+    """Массовое создание комментариев текущего пользователя."""
+
+    model = Comment
+    item_serializer_class = CommentBulkSerializer
+    output_serializer_class = CommentSerializer
+    permission_classes = [IsAdminModeratorOwnerOrReadOnly]
+    cache_resources = CommentViewSet.cache_resources
+
+    def prefetch(self, items):
+        review_ids = {item["review"] for item in items}
+        return {
+            "reviews": Review.objects.only("id", "text").in_bulk(review_ids)
+        }
+
+    def build(self, data, lookups):
+        review = lookups["reviews"].get(data["review"])
+        if review is None:
+            raise ValidationError({"review": ["Отзыв не найден"]})
+        return Comment(
+            review=review, author_id=self.request.user.pk, text=data["text"]
+        )
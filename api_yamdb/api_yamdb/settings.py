@@ -5,7 +5,7 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 CSV_FILES_DIR = os.path.join(BASE_DIR, "static/data")
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = (os.getenv('SECRET_KEY'), 'my_secret_code_ilz@4zqj=rq##zgl9(vs')
+SECRET_KEY = os.getenv('SECRET_KEY', 'my_secret_code_ilz@4zqj=rq##zgl9(vs')
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
@@ -32,6 +32,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.metrics.MetricsMiddleware",
+    "api.middleware.RequestProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -72,10 +74,48 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER', 'postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'AnutaT1010'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
-        'PORT': os.getenv('DB_PORT', '5432')
+        'PORT': os.getenv('DB_PORT', '5432'),
+        # Постоянные соединения: сколько секунд держать соединение
+        # открытым между запросами, 0 - закрывать после каждого запроса.
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        # Нужно при работе через pgbouncer в режиме transaction.
+        'DISABLE_SERVER_SIDE_CURSORS': (
+            os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'false').lower()
+            == 'true'
+        ),
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2 и веса
+# DB_REPLICA_WEIGHTS=3,1. Остальные параметры - как у default, для SQLite
+# вместо хоста указывается файл базы. В тестах реплики указывают на default.
+DB_REPLICA_HOSTS = [
+    host for host in os.getenv('DB_REPLICA_HOSTS', '').split(',') if host
+]
+DB_REPLICA_WEIGHTS = os.getenv('DB_REPLICA_WEIGHTS', '').split(',')
+DATABASE_REPLICAS = {}
+for number, host in enumerate(DB_REPLICA_HOSTS, 1):
+    replica = dict(DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'})
+    if replica['ENGINE'].endswith('sqlite3'):
+        replica['NAME'] = host
+    DATABASES[f'replica{number}'] = replica
+    weight = (
+        DB_REPLICA_WEIGHTS[number - 1]
+        if number <= len(DB_REPLICA_WEIGHTS) else ''
+    )
+    DATABASE_REPLICAS[f'replica{number}'] = int(weight or 1)
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+# Сколько секунд после записи пользователь читает с primary, а чтение
+# измененных ресурсов у всех пользователей идет с primary.
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 10))
+# Через сколько секунд повторять подключение к недоступной реплике.
+REPLICA_RETRY_SECONDS = int(os.getenv('REPLICA_RETRY_SECONDS', 30))
+
+# Проверять постоянное соединение в начале запроса (api/connections.py).
+DB_CONN_HEALTH_CHECKS = (
+    os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+)
+
 
 # Password validation
 
@@ -125,7 +165,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ],
 }
 
@@ -135,11 +175,30 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 5,
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.renderers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+# Библиотека для JSON в API (api/renderers.py): orjson или stdlib.
+# Если orjson не установлен, используется stdlib.
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")
+
+# Кэш роли и статуса пользователя для ClaimsJWTAuthentication: в общем
+# кэше и в памяти процесса. Изменения пользователя видны во всех
+# процессах не позже чем через AUTH_STATE_LOCAL_SECONDS. С LocMemCache
+# общего кэша нет, и после памяти процесса состояние читается из БД.
+AUTH_STATE_CACHE_SECONDS = int(os.getenv('AUTH_STATE_CACHE_SECONDS', 300))
+AUTH_STATE_LOCAL_SECONDS = int(os.getenv('AUTH_STATE_LOCAL_SECONDS', 5))
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
@@ -155,3 +214,68 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 DEFAULT_FROM_EMAIL = "YaMDB@yandex.ru"
 
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+
+# Кэш ответов API. Локальный кэш подходит только для тестов и одного
+# процесса: версии ресурсов должны быть общими для всех воркеров, поэтому
+# в продакшене нужен сервер с протоколом Redis, например
+# CACHE_BACKEND=django_redis.cache.RedisCache
+# CACHE_LOCATION=redis://redis:6379/1
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", "yamdb"),
+    }
+}
+# Время жизни закэшированного ответа в секундах, 0 - не кэшировать.
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", 300))
+
+# Асинхронные представления для частых запросов чтения (api/async_views.py).
+# Включаются в ASGI-режиме: asgi.py задает ASYNC_VIEWS=true.
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() == "true"
+# Потоков для асинхронных представлений в одном процессе.
+ASYNC_VIEW_THREADS = int(os.getenv("ASYNC_VIEW_THREADS", 20))
+
+# Списки отзывов и комментариев собираются из .values() без полей DRF
+# (api/mixins.py, ValuesListMixin).
+VALUES_LIST_FAST_PATH = (
+    os.getenv("VALUES_LIST_FAST_PATH", "true").lower() == "true"
+)
+
+# Массовое создание объектов (api/bulk.py): наибольший размер массива
+# в одном запросе и размер пачки INSERT.
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 500))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 100))
+
+# Выгрузка таблиц (reviews/exporter.py): строк в одной пачке курсора.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+# Рейтинги произведений (reviews/leaderboards.py), пересобираются
+# командой refresh_leaderboards: мест в каждом срезе, вес средней оценки
+# по всем отзывам в байесовском рейтинге (в отзывах), период полураспада
+# веса отзыва и окно отзывов для рейтинга популярных.
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", 100))
+LEADERBOARD_MIN_REVIEWS = int(os.getenv("LEADERBOARD_MIN_REVIEWS", 5))
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", 72))
+TRENDING_WINDOW_DAYS = int(os.getenv("TRENDING_WINDOW_DAYS", 14))
+
+# Метрики Prometheus на /metrics и MetricsMiddleware.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+
+# Профилирование запросов: заголовок Server-Timing, лог api.profiling и
+# статистика по представлениям на /api/v1/profiling/ (только админам).
+REQUEST_PROFILING = os.getenv("REQUEST_PROFILING", "false").lower() == "true"
+# Запросы дольше порога, мс, пишутся в лог вместе с самыми медленными SQL.
+REQUEST_PROFILING_SLOW_MS = int(os.getenv("REQUEST_PROFILING_SLOW_MS", 500))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.profiling": {"handlers": ["console"], "level": "INFO"},
+    },
+}
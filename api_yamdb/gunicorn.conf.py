@@ -0,0 +1,32 @@
+import os
+import shutil
+
+# Метрики воркеров пишутся в mmap-файлы общего каталога, поэтому
+# /metrics любого воркера отдает сумму по всем. Режим включается только
+# здесь, до импорта prometheus_client: команды manage.py в том же образе
+# хранят метрики в памяти своего процесса.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus")
+
+bind = os.getenv("GUNICORN_BIND", "0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", 3))
+
+# SERVER_MODE=asgi: воркеры uvicorn и асинхронные представления чтения.
+if os.getenv("SERVER_MODE", "wsgi") == "asgi":
+    wsgi_app = "api_yamdb.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "api_yamdb.wsgi:application"
+
+
+def on_starting(server):
+    """Очищает файлы метрик прошлого запуска."""
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Убирает из метрик данные завершившегося воркера."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .models import (Category, Comment, Genre, GenreTitle, LeaderboardEntry,
+                     Review, Title)
 
 admin.site.register(Category)
 admin.site.register(Genre)
@@ -8,3 +9,4 @@ admin.site.register(GenreTitle)
 admin.site.register(Title)
 admin.site.register(Review)
 admin.site.register(Comment)
+admin.site.register(LeaderboardEntry)
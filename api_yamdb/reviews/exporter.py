@@ -0,0 +1,119 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+from users.models import User
+
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+
+# Таблицы выгрузки в порядке загрузки и их столбцы: те же файлы и
+# столбцы, что читает load_csv_data. Агрегаты отзывов выгружаются вместе
+# с произведениями, при загрузке они пересчитываются. Хеши паролей не
+# выгружаются: пользователи входят в API по коду подтверждения, а
+# пароль для админки после загрузки задается командой changepassword.
+EXPORT_TABLES = {
+    "category": (Category, ("id", "name", "slug")),
+    "genre": (Genre, ("id", "name", "slug")),
+    "titles": (
+        Title,
+        (
+            "id",
+            "name",
+            "year",
+            "category",
+            "description",
+            "reviews_count",
+            "score_sum",
+            "rating",
+            "score_counts",
+        ),
+    ),
+    "genre_title": (GenreTitle, ("id", "title_id", "genre_id")),
+    "users": (
+        User,
+        (
+            "id",
+            "username",
+            "email",
+            "role",
+            "bio",
+            "first_name",
+            "last_name",
+            "is_active",
+            "is_staff",
+            "is_superuser",
+            "date_joined",
+        ),
+    ),
+    "review": (
+        Review, ("id", "title_id", "text", "author", "score", "pub_date")
+    ),
+    "comments": (
+        Comment, ("id", "review_id", "text", "author", "pub_date")
+    ),
+}
+
+# Столбцы, имя которых не совпадает с полем модели.
+COLUMN_FIELDS = {
+    "category": "category_id",
+    "author": "author_id",
+}
+
+CSV = "csv"
+NDJSON = "ndjson"
+CONTENT_TYPES = {
+    CSV: "text/csv; charset=utf-8",
+    NDJSON: "application/x-ndjson; charset=utf-8",
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def iter_table_rows(file_name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Строки таблицы в порядке id. На PostgreSQL читаются курсором на
+    стороне сервера пачками по chunk_size, поэтому память не зависит
+    от размера таблицы."""
+    model, columns = EXPORT_TABLES[file_name]
+    fields = [COLUMN_FIELDS.get(column, column) for column in columns]
+    return (
+        model.objects.order_by("id")
+        .values_list(*fields)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+class _Line:
+    """Файлоподобный объект для csv.writer: возвращает записанную
+    строку, а не копит ее."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(columns, rows):
+    writer = csv.writer(_Line())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in row
+        )
+
+
+def ndjson_lines(columns, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+FORMATS = {
+    CSV: csv_lines,
+    NDJSON: ndjson_lines,
+}
+
+
+def export_lines(file_name, file_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Поток строк таблицы в формате csv или ndjson."""
+    columns = EXPORT_TABLES[file_name][1]
+    return FORMATS[file_format](
+        columns, iter_table_rows(file_name, chunk_size)
+    )
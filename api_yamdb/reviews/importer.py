@@ -0,0 +1,638 @@
+import csv
+import io
+import itertools
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+
+from django.core.management.color import no_style
+from django.db import IntegrityError, connections, transaction
+from users.models import User
+
+from api_yamdb.settings import CSV_FILES_DIR
+
+from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .utils import rebuild_title_ratings
+
+FILES_CLASSES = {
+    "category": Category,
+    "genre": Genre,
+    "titles": Title,
+    "genre_title": GenreTitle,
+    "users": User,
+    "review": Review,
+    "comments": Comment,
+}
+
+# Столбцы csv-файлов, содержащие внешние ключи: имя поля модели и модель,
+# на которую ссылается ключ.
+FIELDS = {
+    "category": ("category", Category),
+    "title_id": ("title", Title),
+    "genre_id": ("genre", Genre),
+    "author": ("author", User),
+    "review_id": ("review", Review),
+}
+
+# Агрегаты отзывов в выгрузке произведений (export_data): не
+# загружаются, а пересчитываются после загрузки отзывов.
+COMPUTED_COLUMNS = {"reviews_count", "score_sum", "rating", "score_counts"}
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHECKPOINT = os.path.join(CSV_FILES_DIR, ".load_csv_checkpoint.json")
+
+# Режимы --upsert: пропуск строк с существующим ключом или их обновление.
+UPSERT_IGNORE = "ignore"
+UPSERT_UPDATE = "update"
+
+# Пачка объектов и номера строк csv-файла [start, end), из которых
+# она построена (с учетом пропущенных строк).
+Batch = namedtuple("Batch", ("start", "end", "objects"))
+
+
+def csv_path(file_name):
+    """Полный путь к csv-файлу таблицы."""
+    return os.path.join(CSV_FILES_DIR, file_name + ".csv")
+
+
+def iter_csv_rows(file_name):
+    """Построчно читает csv-файл, возвращая словари {столбец: значение}."""
+    with open(csv_path(file_name), encoding="utf-8", newline="") as file:
+        yield from csv.DictReader(file)
+
+
+def batches(iterable, size):
+    """Разбивает поток на списки длиной не более size."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Checkpoint:
+    """Файл с прогрессом загрузки: для каждой таблицы число строк csv,
+    записанных подряд с начала файла, и признак окончания загрузки.
+    Позволяет продолжить прерванную загрузку с места остановки."""
+
+    def __init__(self, path=DEFAULT_CHECKPOINT):
+        self.path = path
+        self.tables = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.tables = json.load(file)
+
+    @staticmethod
+    def signature(file_name):
+        """Размер и время изменения csv-файла: прогресс по измененному
+        файлу не учитывается."""
+        stat = os.stat(csv_path(file_name))
+        return [stat.st_size, stat.st_mtime]
+
+    def _entry(self, file_name):
+        entry = self.tables.get(file_name)
+        try:
+            signature = self.signature(file_name)
+        except FileNotFoundError:
+            return None
+        if entry is None or entry["file"] != signature:
+            return None
+        return entry
+
+    def rows(self, file_name):
+        entry = self._entry(file_name)
+        return entry["rows"] if entry else 0
+
+    def is_done(self, file_name):
+        entry = self._entry(file_name)
+        return bool(entry and entry["done"])
+
+    def update(self, file_name, rows, done=False):
+        if not self.path:
+            return
+        self.tables[file_name] = {
+            "file": self.signature(file_name),
+            "rows": rows,
+            "done": done,
+        }
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.tables, file)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        self.tables = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class IdMap:
+    """Множества первичных ключей таблиц, загруженные в память.
+    Позволяют проверять внешние ключи без запроса на каждую строку."""
+
+    def __init__(self, using="default"):
+        self.using = using
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def ids(self, model):
+        with self._lock:
+            if model not in self._ids:
+                self._ids[model] = set(
+                    model.objects.using(self.using)
+                    .values_list("pk", flat=True)
+                    .iterator()
+                )
+            return self._ids[model]
+
+    def add(self, model, pks):
+        pks = list(pks)
+        ids = self.ids(model)
+        with self._lock:
+            ids.update(pks)
+
+
+def default_fields(models):
+    """{модель: имена полей со значением по умолчанию}."""
+    return {
+        model: {
+            field.attname for field in model._meta.concrete_fields
+            if field.has_default()
+        }
+        for model in models
+    }
+
+
+def table_dependencies(files_classes=None):
+    """Граф зависимостей таблиц по внешним ключам моделей:
+    {имя файла: множество имен файлов родительских таблиц}."""
+    if files_classes is None:
+        files_classes = FILES_CLASSES
+    files = {model: name for name, model in files_classes.items()}
+    return {
+        name: {
+            files[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.many_to_one and field.related_model in files
+            and field.related_model is not model
+        }
+        for name, model in files_classes.items()
+    }
+
+
+class TableStats:
+    """Ход загрузки одной таблицы."""
+
+    def __init__(self, file_name, model):
+        self.file_name = file_name
+        self.model = model
+        self.loaded = 0
+        self.skipped = False
+        self.rows_done = 0
+        self.pending_ranges = {}
+        self.in_flight = 0
+        self.read_finished = False
+        self.error = None
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def name(self):
+        return self.model.__qualname__
+
+    def complete_rows(self, start, end):
+        """Отмечает строки [start, end) записанными. Возвращает True,
+        если сдвинулась граница строк, записанных подряд с начала."""
+        self.pending_ranges[start] = end
+        advanced = False
+        while self.rows_done in self.pending_ranges:
+            self.rows_done = self.pending_ranges.pop(self.rows_done)
+            advanced = True
+        return advanced
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self):
+        return self.loaded / self.elapsed if self.elapsed else 0
+
+
+class CsvLoader:
+    """Потоковая загрузка csv-файлов пачками через bulk_create
+    или COPY (для PostgreSQL).
+
+    Независимые таблицы и пачки строк одной таблицы записываются
+    параллельно в пуле из workers потоков, у каждого потока свое
+    соединение с базой данных."""
+
+    def __init__(
+        self,
+        batch_size=DEFAULT_BATCH_SIZE,
+        use_copy=False,
+        workers=1,
+        upsert=None,
+        checkpoint=None,
+        using="default",
+        stdout=print,
+    ):
+        self.batch_size = batch_size
+        self.using = using
+        self.use_copy = use_copy and self.connection.vendor == "postgresql"
+        if workers > 1 and self.connection.vendor == "sqlite":
+            stdout("SQLite не поддерживает параллельную запись, workers=1.")
+            workers = 1
+        self.workers = workers
+        self.upsert = upsert
+        self.checkpoint = checkpoint or Checkpoint(path=None)
+        self.id_map = IdMap(using)
+        self.default_fields = {}
+        self.write = stdout
+        self._write_lock = threading.Lock()
+
+    @property
+    def connection(self):
+        """Соединение текущего потока."""
+        return connections[self.using]
+
+    def build_object(self, model, row):
+        """Создает объект модели из строки csv, подставляя внешние ключи
+        по id. Пустые значения полей со значением по умолчанию (дата
+        публикации, роль) заменяются им, непустые берутся из файла.
+        Если родительской записи нет, вызывает ValueError: строка не
+        пропускается, а загрузка таблицы останавливается на ее пачке."""
+        data = {}
+        defaults = self.default_fields.get(model, ())
+        for column, value in row.items():
+            if column in COMPUTED_COLUMNS:
+                continue
+            if column not in FIELDS:
+                if value != "" or column not in defaults:
+                    data[column] = value
+                continue
+            field_name, related_model = FIELDS[column]
+            if value == "":
+                data[field_name + "_id"] = None
+                continue
+            related_id = int(value)
+            if related_id not in self.id_map.ids(related_model):
+                raise ValueError(
+                    f"Строка {row.get('id')}: нет записи "
+                    f"{related_model.__qualname__} с id={related_id}"
+                )
+            data[field_name + "_id"] = related_id
+        return model(**data)
+
+    def iter_batches(self, file_name, model, skip=0):
+        """Поток пачек объектов модели, построенных из csv-файла.
+        Первые skip строк файла пропускаются."""
+        rows = enumerate(iter_csv_rows(file_name))
+        for chunk in batches(
+            itertools.islice(rows, skip, None), self.batch_size
+        ):
+            objects = [self.build_object(model, row) for _, row in chunk]
+            yield Batch(chunk[0][0], chunk[-1][0] + 1, objects)
+
+    def write_batch(self, model, objects):
+        if not objects:
+            return 0
+        with transaction.atomic(using=self.using):
+            if self.use_copy:
+                self.copy_batch(model, objects)
+            elif self.upsert == UPSERT_UPDATE:
+                self.update_or_create_batch(model, objects)
+            else:
+                model.objects.using(self.using).bulk_create(
+                    objects, ignore_conflicts=self.upsert == UPSERT_IGNORE
+                )
+        to_python = model._meta.pk.to_python
+        self.id_map.add(model, (to_python(obj.pk) for obj in objects))
+        return len(objects)
+
+    @staticmethod
+    def data_fields(model):
+        """Поля модели, записываемые при обновлении существующих строк."""
+        return [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key
+        ]
+
+    def update_or_create_batch(self, model, objects):
+        """Обновляет строки с существующими id и создает остальные."""
+        to_python = model._meta.pk.to_python
+        manager = model.objects.using(self.using)
+        existing = set(
+            manager.filter(
+                pk__in=[to_python(obj.pk) for obj in objects]
+            ).values_list("pk", flat=True)
+        )
+        for obj in objects:
+            obj.pk = to_python(obj.pk)
+        manager.bulk_update(
+            [obj for obj in objects if obj.pk in existing],
+            [field.name for field in self.data_fields(model)],
+        )
+        manager.bulk_create(
+            [obj for obj in objects if obj.pk not in existing]
+        )
+
+    def copy_batch(self, model, objects):
+        """Записывает пачку объектов командой COPY ... FROM STDIN.
+        В режиме upsert строки копируются во временную таблицу и
+        переносятся через INSERT ... ON CONFLICT."""
+        connection = self.connection
+        quote = connection.ops.quote_name
+        table = quote(model._meta.db_table)
+        fields = [
+            field for field in model._meta.concrete_fields
+            if not field.primary_key or objects[0].pk is not None
+        ]
+        columns = ", ".join(quote(field.column) for field in fields)
+        target = table
+        with connection.cursor() as cursor:
+            if self.upsert:
+                target = quote(model._meta.db_table + "_load")
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE {target} "
+                    f"(LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+                )
+            cursor.cursor.copy_expert(
+                f"COPY {target} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                self.copy_buffer(objects, fields),
+            )
+            if self.upsert:
+                cursor.execute(
+                    f"INSERT INTO {table} ({columns}) "
+                    f"SELECT {columns} FROM {target} "
+                    + self.conflict_clause(model)
+                )
+
+    def conflict_clause(self, model):
+        if self.upsert != UPSERT_UPDATE:
+            return "ON CONFLICT DO NOTHING"
+        quote = self.connection.ops.quote_name
+        assignments = ", ".join(
+            f"{quote(field.column)} = EXCLUDED.{quote(field.column)}"
+            for field in self.data_fields(model)
+        )
+        return (
+            f"ON CONFLICT ({quote(model._meta.pk.column)}) "
+            f"DO UPDATE SET {assignments}"
+        )
+
+    def copy_buffer(self, objects, fields):
+        """Строки пачки в формате csv для команды COPY."""
+        connection = self.connection
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for obj in objects:
+            writer.writerow([
+                field.get_db_prep_save(field.pre_save(obj, True), connection)
+                for field in fields
+            ])
+        buffer.seek(0)
+        return buffer
+
+    def reset_sequences(self, model):
+        """Сдвигает последовательность id после загрузки явных ключей."""
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), [model]
+        )
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+    def report(self, message):
+        with self._write_lock:
+            self.write(message)
+
+    def finish_table(self, table):
+        """Завершает загрузку таблицы."""
+        table.finished = time.monotonic()
+        if table.error is not None:
+            self.report(
+                f"Ошибка в загружаемых данных. {table.error}. "
+                f"Таблица {table.name} не загружена. Загрузка продолжится "
+                f"со строки {table.rows_done + 1} при повторном запуске."
+            )
+            return
+        self.checkpoint.update(table.file_name, table.rows_done, done=True)
+        self.reset_sequences(table.model)
+        if table.model is Review:
+            rebuild_title_ratings()
+        self.report(f"Таблица {table.name} загружена.")
+
+    def load_table(self, file_name, model):
+        """Загружает один csv-файл. Возвращает число загруженных строк."""
+        return self.load_all({file_name: model})[file_name].loaded
+
+    def load_all(self, files_classes=None):
+        """Загружает таблицы с учетом зависимостей между ними.
+        Возвращает словарь {имя файла: TableStats}."""
+        if files_classes is None:
+            files_classes = FILES_CLASSES
+        executor = (
+            ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+        )
+        run = _LoadRun(self, files_classes, executor)
+        self.default_fields = default_fields(files_classes.values())
+        try:
+            run.execute()
+        finally:
+            if executor is not None:
+                self.close_worker_connections(executor)
+                executor.shutdown()
+        if all(table.error is None for table in run.tables.values()):
+            self.checkpoint.clear()
+        return run.tables
+
+    def close_worker_connections(self, executor):
+        """Закрывает соединения с базой данных в каждом потоке пула."""
+        barrier = threading.Barrier(self.workers)
+
+        def close():
+            connections.close_all()
+            barrier.wait()
+
+        for _ in range(self.workers):
+            executor.submit(close)
+
+
+def _completed(function, *args):
+    """Выполняет функцию сразу и возвращает завершенный Future."""
+    future = Future()
+    try:
+        future.set_result(function(*args))
+    except Exception as error:
+        future.set_exception(error)
+    return future
+
+
+class _LoadRun:
+    """Планировщик одного запуска загрузки: читает csv-файлы готовых
+    к загрузке таблиц и отправляет пачки строк в пул потоков."""
+
+    def __init__(self, loader, files_classes, executor):
+        self.loader = loader
+        self.files_classes = files_classes
+        self.executor = executor
+        self.dependencies = table_dependencies(files_classes)
+        self.max_in_flight = loader.workers * 2
+        self.tables = {}
+        self.readers = {}
+        self.in_flight = {}
+
+    def is_loaded(self, name):
+        table = self.tables.get(name)
+        return (
+            table is not None
+            and table.finished is not None
+            and table.error is None
+        )
+
+    def failed_parent(self, name):
+        """Родительская таблица, загрузка которой закончилась ошибкой."""
+        for parent in self.dependencies[name]:
+            table = self.tables.get(parent)
+            if (
+                table is not None
+                and table.finished is not None
+                and table.error is not None
+            ):
+                return table
+        return None
+
+    def block(self, table, parent):
+        """Не загружает таблицу, родитель которой не загружен: ее
+        прогресс в файле не меняется, и при повторном запуске она
+        загрузится после родителя."""
+        table.error = f"Не загружена таблица {parent.name}"
+        table.finished = table.started
+        self.loader.report(
+            f"Таблица {table.name} не загружена: "
+            f"не загружена таблица {parent.name}."
+        )
+
+    def start_ready_tables(self):
+        """Начинает загрузку таблиц, все родители которых загружены.
+        Таблицы с незагруженным из-за ошибки родителем пропускаются."""
+        started = False
+        for name, model in self.files_classes.items():
+            if name in self.tables:
+                continue
+            parent = self.failed_parent(name)
+            if parent is None and not all(
+                self.is_loaded(dependency)
+                for dependency in self.dependencies[name]
+            ):
+                continue
+            table = self.tables[name] = TableStats(name, model)
+            started = True
+            if parent is not None:
+                self.block(table, parent)
+                continue
+            checkpoint = self.loader.checkpoint
+            if checkpoint.is_done(name):
+                table.skipped = True
+                table.finished = table.started
+                self.loader.report(f"Таблица {table.name} уже загружена.")
+                continue
+            table.rows_done = checkpoint.rows(name)
+            message = f"Загрузка таблицы {table.name}"
+            if table.rows_done:
+                message += f" со строки {table.rows_done + 1}"
+            self.loader.report(message)
+            self.readers[name] = self.loader.iter_batches(
+                name, model, skip=table.rows_done
+            )
+        return started
+
+    def next_batch(self, table):
+        """Следующая пачка строк таблицы или None, если чтение окончено."""
+        if table.error is not None:
+            return None
+        try:
+            return next(self.readers[table.file_name])
+        except StopIteration:
+            return None
+        except FileNotFoundError:
+            table.error = f"Файл {table.file_name}.csv не найден"
+        except ValueError as error:
+            table.error = error
+        return None
+
+    def submit(self, table, batch):
+        table.in_flight += 1
+        if self.executor is None:
+            future = _completed(
+                self.loader.write_batch, table.model, batch.objects
+            )
+        else:
+            future = self.executor.submit(
+                self.loader.write_batch, table.model, batch.objects
+            )
+        self.in_flight[future] = (table, batch)
+
+    def feed(self):
+        """Отправляет в пул пачки строк, пока есть свободные места."""
+        for name in list(self.readers):
+            table = self.tables[name]
+            while len(self.in_flight) < self.max_in_flight:
+                batch = self.next_batch(table)
+                if batch is None:
+                    del self.readers[name]
+                    table.read_finished = True
+                    self.finish_if_complete(table)
+                    break
+                self.submit(table, batch)
+
+    def collect(self):
+        """Дожидается записи хотя бы одной пачки и учитывает результат."""
+        completed, _ = wait(self.in_flight, return_when=FIRST_COMPLETED)
+        for future in completed:
+            table, batch = self.in_flight.pop(future)
+            table.in_flight -= 1
+            try:
+                table.loaded += future.result()
+            except (ValueError, IntegrityError) as error:
+                table.error = table.error or error
+            else:
+                if table.complete_rows(batch.start, batch.end):
+                    self.loader.checkpoint.update(
+                        table.file_name, table.rows_done
+                    )
+                self.loader.report(
+                    f"{table.name}: загружено {table.loaded} строк, "
+                    f"{table.rate:.0f} строк/с"
+                )
+            self.finish_if_complete(table)
+
+    def finish_if_complete(self, table):
+        if table.read_finished and not table.in_flight:
+            self.loader.finish_table(table)
+
+    def execute(self):
+        while (
+            len(self.tables) < len(self.files_classes)
+            or self.readers
+            or self.in_flight
+        ):
+            self.start_ready_tables()
+            self.feed()
+            if self.in_flight:
+                self.collect()
+            elif (
+                not self.readers
+                and not self.start_ready_tables()
+                and len(self.tables) < len(self.files_classes)
+            ):
+                raise ValueError("Циклическая зависимость между таблицами.")
@@ -0,0 +1,117 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import GenreTitle, LeaderboardEntry, Review, Title
+
+ALL_SCOPE = "all"
+
+
+def genre_scope(slug):
+    return f"genre:{slug}"
+
+
+def category_scope(slug):
+    return f"category:{slug}"
+
+
+def bayesian_ratings(min_reviews):
+    """{id: взвешенный рейтинг} произведений с отзывами. Средняя оценка
+    произведения сдвигается к средней по всем отзывам тем сильнее, чем
+    меньше у него отзывов по сравнению с min_reviews."""
+    rows = list(
+        Title.objects.filter(reviews_count__gt=0).values_list(
+            "id", "reviews_count", "score_sum"
+        )
+    )
+    count = sum(reviews for _, reviews, _ in rows)
+    if not count:
+        return {}
+    mean = sum(total for _, _, total in rows) / count
+    return {
+        pk: (mean * min_reviews + total) / (min_reviews + reviews)
+        for pk, reviews, total in rows
+    }
+
+
+def trending_scores(now, half_life_hours, window_days):
+    """{id: сумма оценок отзывов за window_days дней}. Вес оценки
+    уменьшается вдвое каждые half_life_hours часов с момента
+    публикации отзыва."""
+    scores = defaultdict(float)
+    rows = (
+        Review.objects.filter(pub_date__gte=now - timedelta(days=window_days))
+        .exclude(title=None)
+        .order_by()
+        .values_list("title_id", "score", "pub_date")
+    )
+    for title_id, score, pub_date in rows.iterator():
+        age = (now - pub_date).total_seconds() / 3600
+        scores[title_id] += score * 0.5 ** (age / half_life_hours)
+    return scores
+
+
+def title_scopes():
+    """{id: срезы рейтинга, в которые попадает произведение}."""
+    scopes = {
+        pk: {ALL_SCOPE, category_scope(slug)} if slug else {ALL_SCOPE}
+        for pk, slug in Title.objects.values_list("id", "category__slug")
+    }
+    for title_id, slug in GenreTitle.objects.values_list(
+        "title_id", "genre__slug"
+    ):
+        scopes[title_id].add(genre_scope(slug))
+    return scopes
+
+
+def rank(board, scores, scopes, size):
+    """Первые size мест каждого среза. При равных оценках выше
+    произведение с меньшим id."""
+    candidates = defaultdict(list)
+    for pk, score in scores.items():
+        for scope in scopes.get(pk, ()):
+            candidates[scope].append((-score, pk))
+    for scope, items in candidates.items():
+        for position, (score, pk) in enumerate(
+            heapq.nsmallest(size, items), 1
+        ):
+            yield LeaderboardEntry(
+                board=board,
+                scope=scope,
+                position=position,
+                title_id=pk,
+                score=-score,
+            )
+
+
+def refresh_leaderboards(now=None, batch_size=1000):
+    """Пересобирает таблицу рейтингов в одной транзакции: до коммита
+    читатели видят предыдущую версию. Возвращает {рейтинг: строк}."""
+    if now is None:
+        now = timezone.now()
+    scopes = title_scopes()
+    boards = {
+        LeaderboardEntry.BEST: bayesian_ratings(
+            settings.LEADERBOARD_MIN_REVIEWS
+        ),
+        LeaderboardEntry.TRENDING: trending_scores(
+            now,
+            settings.TRENDING_HALF_LIFE_HOURS,
+            settings.TRENDING_WINDOW_DAYS,
+        ),
+    }
+    entries = {
+        board: list(rank(board, scores, scopes, settings.LEADERBOARD_SIZE))
+        for board, scores in boards.items()
+    }
+    with transaction.atomic():
+        LeaderboardEntry.objects.all().delete()
+        for board_entries in entries.values():
+            LeaderboardEntry.objects.bulk_create(
+                board_entries, batch_size=batch_size
+            )
+    return {board: len(items) for board, items in entries.items()}
@@ -0,0 +1,115 @@
+import statistics
+import time
+
+from api.search import search_titles
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+class Command(BaseCommand):
+    """Планы выполнения и время основных запросов API.
+
+    Чтобы сравнить планы до и после индексов, запустите команду на
+    миграции reviews 0004 и после применения всех миграций, например
+    на данных generate_fake_data --titles 20000 --reviews-per-title 100.
+    """
+
+    help = "Печатает EXPLAIN и задержки запросов, которые выполняет API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="EXPLAIN ANALYZE (только PostgreSQL).",
+        )
+
+    def hot_queries(self):
+        """Запросы, соответствующие обращениям к API."""
+        title = (
+            Title.objects.annotate(count=Count("reviews"))
+            .order_by("-count")
+            .first()
+        )
+        review = (
+            Review.objects.filter(title=title)
+            .annotate(count=Count("comments"))
+            .order_by("-count")
+            .first()
+        )
+        if title is None or review is None:
+            raise CommandError("В базе нет отзывов, нечего измерять.")
+        middle = Review.objects.filter(title=title).order_by(
+            "-pub_date", "-id"
+        )[title.reviews.count() // 2]
+        queries = {
+            "Отзывы произведения, первая страница": Review.objects.filter(
+                title=title
+            ).order_by("-pub_date", "-id")[:5],
+            "Отзывы произведения, страница из середины": Review.objects
+            .filter(title=title, pub_date__lte=middle.pub_date)
+            .exclude(pub_date=middle.pub_date, id__gte=middle.id)
+            .order_by("-pub_date", "-id")[:5],
+            "Проверка повторного отзыва": Review.objects.filter(
+                title=title, author_id=review.author_id
+            )[:1],
+            "Комментарии к отзыву": Comment.objects.filter(
+                review=review
+            ).order_by("-pub_date", "-id")[:5],
+            "Список произведений": Title.objects.order_by(
+                "-year", "name", "id"
+            )[:5],
+            "Поиск произведений (search)": search_titles(
+                Title.objects.all(), title.name
+            ).order_by("-search_rank", "id")[:5],
+        }
+        queries.update(self.filter_queries())
+        return queries
+
+    @staticmethod
+    def filter_queries():
+        """Фильтры произведений genre и category и поиск жанров и
+        категорий по названию (icontains)."""
+        queries = {}
+        for name, model in (("genre", Genre), ("category", Category)):
+            value = model.objects.values_list("name", flat=True).first()
+            if value:
+                queries[f"Поиск ({name}, search)"] = (
+                    model.objects.filter(name__icontains=value)
+                    .order_by("id")[:5]
+                )
+        for name, model, lookup in (
+            ("genre", Genre, "genre__slug__icontains"),
+            ("category", Category, "category__slug__icontains"),
+        ):
+            slug = model.objects.values_list("slug", flat=True).first()
+            if slug:
+                queries[f"Фильтр произведений ({name})"] = (
+                    Title.objects.filter(**{lookup: slug})
+                    .order_by("-year", "name", "id")[:5]
+                )
+        return queries
+
+    def measure(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options = {"analyze": True, "buffers": True}
+        for name, queryset in self.hot_queries().items():
+            timings = self.measure(queryset, options["repeat"])
+            print(f"== {name}")
+            print(queryset.explain(**explain_options))
+            print(
+                f"медиана {statistics.median(timings):.3f} мс, "
+                f"максимум {max(timings):.3f} мс"
+            )
+            print()
@@ -0,0 +1,63 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from reviews.exporter import CSV, EXPORT_TABLES, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    """Выгрузка каталога, пользователей, отзывов и комментариев в файлы
+    <таблица>.csv или <таблица>.ndjson. Выгрузку в csv можно загрузить
+    обратно командой load_csv_data, кроме паролей пользователей."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "tables",
+            nargs="*",
+            help=(
+                "Таблицы для выгрузки, по умолчанию все: "
+                + ", ".join(EXPORT_TABLES)
+            ),
+        )
+        parser.add_argument(
+            "--format",
+            dest="file_format",
+            choices=list(FORMATS),
+            default=CSV,
+            help="Формат файлов.",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default="export",
+            help="Каталог для файлов, создается при необходимости.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=settings.EXPORT_CHUNK_SIZE,
+            help="Строк в одной пачке курсора.",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["tables"]) - set(EXPORT_TABLES)
+        if unknown:
+            raise CommandError(f"Нет таблиц: {', '.join(sorted(unknown))}")
+        file_format = options["file_format"]
+        os.makedirs(options["output_dir"], exist_ok=True)
+        for table in options["tables"] or EXPORT_TABLES:
+            path = os.path.join(
+                options["output_dir"], f"{table}.{file_format}"
+            )
+            started = time.monotonic()
+            rows = -1 if file_format == CSV else 0
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                for line in export_lines(
+                    table, file_format, options["chunk_size"]
+                ):
+                    file.write(line)
+                    rows += 1
+            self.stdout.write(
+                f"{table:<12} {rows:>10} строк "
+                f"{time.monotonic() - started:>8.2f} с -> {path}"
+            )
@@ -0,0 +1,163 @@
+import random
+import time
+
+from api.cache import bump_versions
+from django.core.management import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.utils import rebuild_title_ratings
+from users.models import User
+
+
+def next_id(model):
+    return (model.objects.aggregate(max_id=Max("pk"))["max_id"] or 0) + 1
+
+
+class Command(BaseCommand):
+    """Генерация синтетических данных для нагрузочных тестов."""
+
+    help = (
+        "Заполняет базу случайными произведениями, пользователями, "
+        "отзывами и комментариями. Размеры умножаются на --scale."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--genres", type=int, default=20)
+        parser.add_argument("--titles", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--reviews-per-title", type=int, default=20)
+        parser.add_argument("--comments-per-review", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        random.seed(options["seed"])
+        scale = options["scale"]
+        self.batch_size = options["batch_size"]
+        self.prefix = f"fake{int(time.time())}"
+        users = max(int(options["users"] * scale), 1)
+        titles = max(int(options["titles"] * scale), 1)
+        reviews_per_title = min(options["reviews_per_title"], users)
+        started = time.monotonic()
+        with transaction.atomic():
+            category_ids = self.create_categories(options["categories"])
+            genre_ids = self.create_genres(options["genres"])
+            user_ids = self.create_users(users)
+            title_ids = self.create_titles(titles, category_ids, genre_ids)
+            review_ids = self.create_reviews(
+                title_ids, user_ids, reviews_per_title
+            )
+            self.create_comments(
+                review_ids, user_ids, options["comments_per_review"]
+            )
+            self.reset_sequences()
+            rebuild_title_ratings(batch_size=self.batch_size)
+        bump_versions()
+        print(f"Данные созданы за {time.monotonic() - started:.1f} с.")
+
+    def bulk_create(self, model, objects):
+        """Записывает поток объектов пачками, возвращает их количество."""
+        batch = []
+        count = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        model.objects.bulk_create(batch)
+        count += len(batch)
+        print(f"{model.__qualname__}: создано {count}")
+        return count
+
+    def create_categories(self, count):
+        start = next_id(Category)
+        ids = range(start, start + count)
+        self.bulk_create(Category, (
+            Category(
+                id=pk, name=f"Категория {pk}", slug=f"{self.prefix}-c{pk}"
+            )
+            for pk in ids
+        ))
+        return ids
+
+    def create_genres(self, count):
+        start = next_id(Genre)
+        ids = range(start, start + count)
+        self.bulk_create(Genre, (
+            Genre(id=pk, name=f"Жанр {pk}", slug=f"{self.prefix}-g{pk}")
+            for pk in ids
+        ))
+        return ids
+
+    def create_users(self, count):
+        start = next_id(User)
+        ids = range(start, start + count)
+        self.bulk_create(User, (
+            User(
+                id=pk,
+                username=f"{self.prefix}_{pk}",
+                email=f"{self.prefix}_{pk}@yamdb.fake",
+            )
+            for pk in ids
+        ))
+        return ids
+
+    def create_titles(self, count, category_ids, genre_ids):
+        start = next_id(Title)
+        ids = range(start, start + count)
+        self.bulk_create(Title, (
+            Title(
+                id=pk,
+                name=f"Произведение {pk}",
+                year=random.randint(1900, 2020),
+                description=f"Описание произведения {pk}",
+                category_id=random.choice(category_ids),
+            )
+            for pk in ids
+        ))
+        self.bulk_create(GenreTitle, (
+            GenreTitle(title_id=pk, genre_id=genre_id)
+            for pk in ids
+            for genre_id in random.sample(genre_ids, random.randint(1, 3))
+        ))
+        return ids
+
+    def create_reviews(self, title_ids, user_ids, per_title):
+        start = next_id(Review)
+        count = self.bulk_create(Review, (
+            Review(
+                id=start + index * per_title + offset,
+                title_id=title_id,
+                author_id=author_id,
+                score=random.randint(1, 10),
+                text=f"Отзыв {index}-{offset}",
+            )
+            for index, title_id in enumerate(title_ids)
+            for offset, author_id in enumerate(
+                random.sample(user_ids, per_title)
+            )
+        ))
+        return range(start, start + count)
+
+    def create_comments(self, review_ids, user_ids, per_review):
+        self.bulk_create(Comment, (
+            Comment(
+                review_id=review_id,
+                author_id=random.choice(user_ids),
+                text=f"Комментарий к отзыву {review_id}",
+            )
+            for review_id in review_ids
+            for _ in range(per_review)
+        ))
+
+    def reset_sequences(self):
+        models = (Category, Genre, User, Title, GenreTitle, Review, Comment)
+        statements = connection.ops.sequence_reset_sql(no_style(), models)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
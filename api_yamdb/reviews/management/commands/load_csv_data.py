@@ -1,79 +1,77 @@
-import csv
-import os
-
+from api.cache import bump_versions
 from django.core.management import BaseCommand
-from django.db import IntegrityError
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
-from users.models import User
-
-from api_yamdb.settings import CSV_FILES_DIR
-
-FILES_CLASSES = {
-    "category": Category,
-    "genre": Genre,
-    "titles": Title,
-    "genre_title": GenreTitle,
-    "users": User,
-    "review": Review,
-    "comments": Comment,
-}
-
-FIELDS = {
-    "category": ("category", Category),
-    "title_id": ("title", Title),
-    "genre_id": ("genre", Genre),
-    "author": ("author", User),
-    "review_id": ("review", Review),
-}
-
-
-def open_csv_file(file_name):
-    """Менеджер контекста для открытия csv-файлов."""
-    csv_file = file_name + ".csv"
-    csv_path = os.path.join(CSV_FILES_DIR, csv_file)
-    try:
-        with open(csv_path, encoding="utf-8") as file:
-            return list(csv.reader(file))
-    except FileNotFoundError:
-        print(f"Файл {csv_file} не найден.")
-
-
-def change_foreign_values(data_csv):
-    """Изменяет значения."""
-    data_csv_copy = data_csv.copy()
-    for field_key, field_value in data_csv.items():
-        if field_key in FIELDS.keys():
-            field_key0 = FIELDS[field_key][0]
-            data_csv_copy[field_key0] = FIELDS[field_key][1].objects.get(
-                pk=field_value
-            )
-    return data_csv_copy
-
-
-def load_csv(file_name, class_name):
-    """Осуществляет загрузку csv-файлов."""
-    table_not_loaded = f"Таблица {class_name.__qualname__} не загружена."
-    table_loaded = f"Таблица {class_name.__qualname__} загружена."
-    data = open_csv_file(file_name)
-    rows = data[1:]
-    for row in rows:
-        data_csv = dict(zip(data[0], row))
-        data_csv = change_foreign_values(data_csv)
-        try:
-            table = class_name(**data_csv)
-            table.save()
-        except (ValueError, IntegrityError) as error:
-            print(
-                f"Ошибка в загружаемых данных. {error}. " f"{table_not_loaded}"
-            )
-            break
-    print(table_loaded)
+from reviews.importer import (DEFAULT_BATCH_SIZE, DEFAULT_CHECKPOINT,
+                              UPSERT_IGNORE, UPSERT_UPDATE, Checkpoint,
+                              CsvLoader)
 
 
 class Command(BaseCommand):
     """Класс загрузки тестовой базы данных."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Количество строк в одной пачке bulk_create/COPY.",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Использовать COPY, если база данных - PostgreSQL.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Количество потоков записи, у каждого свое соединение.",
+        )
+        parser.add_argument(
+            "--upsert",
+            nargs="?",
+            const=UPSERT_IGNORE,
+            choices=(UPSERT_IGNORE, UPSERT_UPDATE),
+            help=(
+                "Не падать на строках с уже существующим id: пропускать "
+                "их (ignore, по умолчанию) или обновлять (update)."
+            ),
+        )
+        parser.add_argument(
+            "--checkpoint",
+            default=DEFAULT_CHECKPOINT,
+            help="Файл с прогрессом загрузки для продолжения после сбоя.",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Начать загрузку заново, не учитывая сохраненный прогресс.",
+        )
+
     def handle(self, *args, **options):
-        for key, value in FILES_CLASSES.items():
-            print(f"Загрузка таблицы {value.__qualname__}")
-            load_csv(key, value)
+        checkpoint = Checkpoint(options["checkpoint"])
+        if options["restart"]:
+            checkpoint.clear()
+        loader = CsvLoader(
+            batch_size=options["batch_size"],
+            use_copy=options["copy"],
+            workers=options["workers"],
+            upsert=options["upsert"],
+            checkpoint=checkpoint,
+            stdout=print,
+        )
+        tables = loader.load_all()
+        # bulk_create и COPY не отправляют сигналы моделей.
+        bump_versions()
+        print("Итоги загрузки:")
+        for table in tables.values():
+            if table.error is not None:
+                status = "ошибка"
+            elif table.skipped:
+                status = "загружена ранее"
+            else:
+                status = "ok"
+            print(
+                f"{table.name:<12} {table.loaded:>10} строк "
+                f"{table.elapsed:>8.2f} с {table.rate:>10.0f} строк/с "
+                f"{status}"
+            )
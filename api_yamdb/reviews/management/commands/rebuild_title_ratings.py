@@ -0,0 +1,47 @@
+from api.cache import TITLES, bump_version
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from reviews.models import Title
+from reviews.utils import calculate_title_ratings, rebuild_title_ratings
+
+
+class Command(BaseCommand):
+    """Пересчет и проверка хранимых рейтингов произведений."""
+
+    help = (
+        "Пересчитывает количество отзывов, сумму оценок, рейтинг и "
+        "распределение оценок."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Только проверить агрегаты, ничего не изменяя.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            actual = calculate_title_ratings()
+            stored = Title.objects.values_list(
+                "id", "reviews_count", "score_sum", "rating", "score_counts"
+            )
+            broken = [
+                pk for pk, *aggregates in stored
+                if actual[pk] != tuple(aggregates)
+            ]
+            if broken:
+                raise CommandError(
+                    f"Агрегаты расходятся у произведений: {broken}"
+                )
+            print("Агрегаты всех произведений корректны.")
+            return
+        with transaction.atomic():
+            changed = rebuild_title_ratings(
+                batch_size=options["batch_size"]
+            )
+        # bulk_update не вызывает сигналы, которые сбросили бы кэш.
+        if changed:
+            bump_version(TITLES)
+        print(f"Пересчитаны агрегаты произведений: {len(changed)}.")
@@ -0,0 +1,39 @@
+import time
+
+from api.cache import LEADERBOARDS, bump_version
+from django.core.management import BaseCommand
+from django.db import close_old_connections
+from reviews.leaderboards import refresh_leaderboards
+
+
+class Command(BaseCommand):
+    """Пересборка рейтингов лучших и популярных произведений."""
+
+    help = "Пересобирает таблицу рейтингов произведений."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Работать постоянно, пересобирая рейтинги каждые "
+                 "--interval с.",
+        )
+        parser.add_argument("--interval", type=float, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            counts = refresh_leaderboards(batch_size=options["batch_size"])
+            # Таблица пишется через bulk_create, сигналы не отправляются.
+            bump_version(LEADERBOARDS)
+            print(
+                ", ".join(
+                    f"{board}: {count}" for board, count in counts.items()
+                )
+                + f" строк за {time.monotonic() - started:.2f} с"
+            )
+            if not options["loop"]:
+                return
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# Индексы для поиска существуют только в PostgreSQL: триграммные GIN-индексы
+# ускоряют LIKE/ILIKE с ведущим % и поиск по сходству, а вычисляемый
+# столбец search_vector - полнотекстовый поиск по названию и описанию.
+TRIGRAM_INDEXES = (
+    ('reviews_title', 'name'),
+    ('reviews_genre', 'name'),
+    ('reviews_genre', 'slug'),
+    ('reviews_category', 'name'),
+    ('reviews_category', 'slug'),
+)
+
+FORWARD_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    *(
+        f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+        f'ON {table} USING gin ({column} gin_trgm_ops)'
+        for table, column in TRIGRAM_INDEXES
+    ),
+    "ALTER TABLE reviews_title ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', "
+    "coalesce(name, '') || ' ' || coalesce(description, ''))) STORED",
+    'CREATE INDEX reviews_title_search_vector '
+    'ON reviews_title USING gin (search_vector)',
+]
+
+BACKWARD_SQL = [
+    'DROP INDEX IF EXISTS reviews_title_search_vector',
+    'ALTER TABLE reviews_title DROP COLUMN IF EXISTS search_vector',
+    *(
+        f'DROP INDEX IF EXISTS {table}_{column}_trgm'
+        for table, column in TRIGRAM_INDEXES
+    ),
+]
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgresql(FORWARD_SQL), run_postgresql(BACKWARD_SQL)
+        ),
+    ]
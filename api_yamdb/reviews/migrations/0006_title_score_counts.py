@@ -0,0 +1,46 @@
+# Generated by Django 3.2 on 2026-10-17 06:20
+
+import reviews.models
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_score_counts(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    rows = (
+        Review.objects.exclude(title=None)
+        .order_by('title_id')
+        .values_list('title_id', 'score')
+        .annotate(number=Count('id'))
+    )
+    titles = {}
+    for title_id, score, number in rows.iterator():
+        counts = titles.setdefault(
+            title_id, reviews.models.empty_score_counts()
+        )
+        counts[score - reviews.models.SCORES.start] = number
+    Title.objects.bulk_update(
+        [
+            Title(pk=title_id, score_counts=counts)
+            for title_id, counts in titles.items()
+        ],
+        ('score_counts',),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_counts',
+            field=models.JSONField(default=reviews.models.empty_score_counts, editable=False, verbose_name='Распределение оценок'),
+        ),
+        migrations.RunPython(fill_score_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# Фильтры icontains Django 3.2 компилирует на PostgreSQL в
+# UPPER(column::text) LIKE UPPER(%s). Такое условие обслуживает только
+# индекс по тому же выражению, индекс по самому столбцу из 0004 не
+# подходит. Выражение используют фильтры произведений genre и category
+# (slug) и поиск ?search= по названию в списках жанров и категорий
+# (SearchFilter, name). Индексы по самим столбцам жанров и категорий
+# заменяются индексами по выражению. Индекс по названию произведения
+# остается: его используют фильтр name (contains) и оператор сходства %
+# в поиске.
+UPPER_INDEXES = (
+    ('reviews_genre', 'name'),
+    ('reviews_genre', 'slug'),
+    ('reviews_category', 'name'),
+    ('reviews_category', 'slug'),
+)
+
+FORWARD_SQL = [
+    *(
+        f'CREATE INDEX IF NOT EXISTS {table}_{column}_upper_trgm '
+        f'ON {table} USING gin (UPPER({column}::text) gin_trgm_ops)'
+        for table, column in UPPER_INDEXES
+    ),
+    *(
+        f'DROP INDEX IF EXISTS {table}_{column}_trgm'
+        for table, column in UPPER_INDEXES
+    ),
+]
+
+BACKWARD_SQL = [
+    *(
+        f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+        f'ON {table} USING gin ({column} gin_trgm_ops)'
+        for table, column in UPPER_INDEXES
+    ),
+    *(
+        f'DROP INDEX IF EXISTS {table}_{column}_upper_trgm'
+        for table, column in UPPER_INDEXES
+    ),
+]
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_leaderboard_entry'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgresql(FORWARD_SQL), run_postgresql(BACKWARD_SQL)
+        ),
+    ]
@@ -2,9 +2,17 @@ from datetime import datetime
 
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     RegexValidator)
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from users.models import User
 
+# Допустимые оценки отзыва.
+SCORES = range(1, 11)
+
+
+def empty_score_counts():
+    return [0] * len(SCORES)
+
 
 class Category(models.Model):
     """Класс категорий."""
@@ -101,14 +109,59 @@ class Title(models.Model):
         null=True,
         verbose_name="Категория",
     )
+    # Агрегаты по отзывам хранятся в таблице произведений и обновляются
+    # вместе с отзывами, чтобы не считать Avg при каждом запросе.
+    reviews_count = models.PositiveIntegerField(
+        verbose_name="Количество отзывов",
+        default=0,
+        editable=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        verbose_name="Сумма оценок",
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name="Рейтинг",
+        null=True,
+        editable=False,
+    )
+    # Количество отзывов с каждой оценкой: score_counts[0] - оценок 1,
+    # score_counts[9] - оценок 10.
+    score_counts = models.JSONField(
+        verbose_name="Распределение оценок",
+        default=empty_score_counts,
+        editable=False,
+    )
 
     class Meta:
         ordering = ("-year", "name")
         verbose_name = "Произведение"
+        indexes = [
+            # Сортировка списка произведений и ключ постраничного вывода.
+            models.Index(
+                fields=["-year", "name", "id"], name="title_year_name_idx"
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def median_score(self):
+        """Медиана оценок по распределению score_counts."""
+        total = sum(self.score_counts)
+        if not total:
+            return None
+        middle = ((total - 1) // 2, total // 2)
+        values = []
+        seen = 0
+        for score, count in zip(SCORES, self.score_counts):
+            seen += count
+            while len(values) < 2 and middle[len(values)] < seen:
+                values.append(score)
+        return sum(values) / 2
+
 
 class GenreTitle(models.Model):
     """Вспомогательный класс, связывающий жанры и произведения."""
@@ -153,8 +206,13 @@ class Review(models.Model):
             MaxValueValidator(10, "Допустимы значения от 1 до 10"),
         ],
     )
+    # Не auto_now_add: дата, заданная явно (загрузка из csv), сохраняется
+    # и при bulk_create.
     pub_date = models.DateTimeField(
-        verbose_name="Дата публикации", auto_now_add=True, db_index=True
+        verbose_name="Дата публикации",
+        default=timezone.now,
+        editable=False,
+        db_index=True,
     )
 
     class Meta:
@@ -162,10 +220,34 @@ class Review(models.Model):
         verbose_name_plural = "Отзывы"
         ordering = ("-pub_date",)
         constraints = [
+            # Индекс ограничения обслуживает и проверку повторного отзыва.
             models.UniqueConstraint(
                 fields=["title", "author"], name="unique_review"
             ),
         ]
+        indexes = [
+            # Отзывы произведения, начиная с новых, без сортировки в памяти.
+            models.Index(
+                fields=["title", "-pub_date", "-id"],
+                name="review_title_pub_date_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные из базы произведение и оценку,
+        чтобы при сохранении пересчитать агрегаты по разнице."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            "title_id": instance.__dict__.get("title_id"),
+            "score": instance.__dict__.get("score"),
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и агрегаты произведения в одной транзакции."""
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
 
 
 class Comment(models.Model):
@@ -184,11 +266,63 @@ class Comment(models.Model):
         on_delete=models.CASCADE,
         related_name="comments",
     )
+    # Не auto_now_add: дата, заданная явно (загрузка из csv), сохраняется
+    # и при bulk_create.
     pub_date = models.DateTimeField(
-        verbose_name="Дата публикации", auto_now_add=True, db_index=True
+        verbose_name="Дата публикации",
+        default=timezone.now,
+        editable=False,
+        db_index=True,
     )
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ("-pub_date",)
+        indexes = [
+            models.Index(
+                fields=["review", "-pub_date", "-id"],
+                name="comment_review_pub_date_idx",
+            ),
+        ]
+
+
+class LeaderboardEntry(models.Model):
+    """Место произведения в материализованном рейтинге. Таблица целиком
+    пересобирается командой refresh_leaderboards."""
+
+    BEST = "best"
+    TRENDING = "trending"
+    BOARDS = (
+        (BEST, "Лучшие"),
+        (TRENDING, "Популярные сейчас"),
+    )
+
+    board = models.CharField(
+        verbose_name="Рейтинг", max_length=16, choices=BOARDS
+    )
+    # all, genre:<slug> или category:<slug>.
+    scope = models.CharField(verbose_name="Срез", max_length=64)
+    position = models.PositiveIntegerField(verbose_name="Место")
+    title = models.ForeignKey(
+        Title,
+        verbose_name="Произведение",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    score = models.FloatField(verbose_name="Оценка")
+
+    class Meta:
+        verbose_name = "Место в рейтинге"
+        verbose_name_plural = "Рейтинги произведений"
+        ordering = ("board", "scope", "position")
+        constraints = [
+            # Индекс ограничения обслуживает чтение страницы рейтинга.
+            models.UniqueConstraint(
+                fields=["board", "scope", "position"],
+                name="unique_leaderboard_position",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.board} {self.scope} #{self.position}"
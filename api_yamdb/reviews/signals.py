@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Review, Title
+from .utils import rebuild_title_ratings, update_title_rating
+
+
+def _loaded_values(instance):
+    """Значения произведения и оценки, с которыми отзыв был загружен."""
+    loaded = getattr(instance, "_loaded_values", None)
+    if loaded is None or loaded["score"] is None:
+        return None
+    return loaded
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, **kwargs):
+    """Обновляет агрегаты произведения после создания или изменения
+    отзыва."""
+    old = _loaded_values(instance)
+    if created:
+        update_title_rating(instance.title_id, added=instance.score)
+    elif old is None:
+        # Отзыв загружен без оценки: разницу не посчитать, пересчитываем.
+        rebuild_title_ratings(Title.objects.filter(pk=instance.title_id))
+    elif old["title_id"] != instance.title_id:
+        update_title_rating(old["title_id"], removed=old["score"])
+        update_title_rating(instance.title_id, added=instance.score)
+    else:
+        update_title_rating(
+            instance.title_id, added=instance.score, removed=old["score"]
+        )
+    instance._loaded_values = {
+        "title_id": instance.title_id,
+        "score": instance.score,
+    }
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    """Обновляет агрегаты произведения после удаления отзыва."""
+    old = _loaded_values(instance) or {
+        "title_id": instance.title_id,
+        "score": instance.score,
+    }
+    update_title_rating(old["title_id"], removed=old["score"])
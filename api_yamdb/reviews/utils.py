@@ -0,0 +1,98 @@
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, When
+from django.db.models.functions import Cast
+
+from .models import SCORES, Review, Title, empty_score_counts
+
+
+def update_title_rating(title_id, added=None, removed=None):
+    """Изменяет хранимые агрегаты произведения: added - оценка
+    добавленного отзыва, removed - оценка удаленного."""
+    if title_id is None or added == removed:
+        return
+    with transaction.atomic():
+        # Блокировка строки: распределение оценок меняется в Python.
+        score_counts = (
+            Title.objects.select_for_update()
+            .filter(pk=title_id)
+            .values_list("score_counts", flat=True)
+            .first()
+        )
+        if score_counts is None:
+            return
+        count_delta = score_delta = 0
+        for score, sign in ((added, 1), (removed, -1)):
+            if score is not None:
+                score_counts[score - SCORES.start] += sign
+                count_delta += sign
+                score_delta += sign * score
+        titles = Title.objects.filter(pk=title_id)
+        titles.update(
+            reviews_count=F("reviews_count") + count_delta,
+            score_sum=F("score_sum") + score_delta,
+            score_counts=score_counts,
+        )
+        titles.update(
+            rating=Case(
+                When(reviews_count=0, then=None),
+                default=(
+                    Cast(F("score_sum"), FloatField()) / F("reviews_count")
+                ),
+                output_field=FloatField(),
+            )
+        )
+
+
+def title_aggregates(score_counts):
+    """Количество отзывов, сумма оценок и рейтинг по распределению."""
+    count = sum(score_counts)
+    total = sum(
+        score * number for score, number in zip(SCORES, score_counts)
+    )
+    return count, total, total / count if count else None
+
+
+def calculate_title_ratings(titles=None):
+    """Возвращает словарь {id: (количество, сумма, рейтинг,
+    распределение оценок)}, посчитанный по таблице отзывов."""
+    if titles is None:
+        titles = Title.objects.all()
+    score_counts = {
+        pk: empty_score_counts()
+        for pk in titles.order_by().values_list("id", flat=True)
+    }
+    rows = (
+        Review.objects.filter(title__in=titles.order_by().values("id"))
+        .order_by()
+        .values_list("title_id", "score")
+        .annotate(number=Count("id"))
+    )
+    for pk, score, number in rows:
+        score_counts[pk][score - SCORES.start] = number
+    return {
+        pk: title_aggregates(counts) + (counts,)
+        for pk, counts in score_counts.items()
+    }
+
+
+def rebuild_title_ratings(titles=None, batch_size=1000):
+    """Пересчитывает агрегаты произведений по таблице отзывов.
+    Возвращает список id произведений, у которых агрегаты расходились."""
+    if titles is None:
+        titles = Title.objects.all()
+    actual = calculate_title_ratings(titles)
+    changed = []
+    fields = ("reviews_count", "score_sum", "rating", "score_counts")
+    for title in titles.only("id", *fields):
+        stored = tuple(getattr(title, field) for field in fields)
+        if stored == actual[title.pk]:
+            continue
+        (
+            title.reviews_count,
+            title.score_sum,
+            title.rating,
+            title.score_counts,
+        ) = actual[title.pk]
+        changed.append(title)
+    Title.objects.bulk_update(changed, fields, batch_size=batch_size)
+    return [title.pk for title in changed]
@@ -1,9 +1,18 @@
 import sys
 from os.path import abspath, dirname, join
 
+from django.conf import settings
+
 root_dir = dirname(dirname(abspath(__file__)))
 sys.path.append(root_dir)
 infra_dir_path = join(root_dir, 'infra')
 
+# Реплика для тестов маршрутизации чтения: отдельное соединение с той же
+# тестовой базой. Запросы на нее идут, только если тест задает
+# DATABASE_REPLICAS.
+settings.DATABASES.setdefault(
+    'replica1', dict(settings.DATABASES['default'], TEST={'MIRROR': 'default'})
+)
+
 pytest_plugins = [
 ]
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+import pytest
+from api import db_router
+from api.async_views import async_routes, executor
+from api.urls import router
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient
+from django.urls import include, path, resolve
+from reviews.models import Title
+
+urlpatterns = [
+    path('api/v1/', include(async_routes(router.urls))),
+]
+
+
+def in_every_thread(function):
+    """Результаты function во всех потоках пула асинхронных
+    представлений."""
+    barrier = threading.Barrier(settings.ASYNC_VIEW_THREADS)
+
+    def run():
+        barrier.wait()
+        return function()
+
+    futures = [
+        executor.submit(run) for _ in range(settings.ASYNC_VIEW_THREADS)
+    ]
+    return [future.result() for future in futures]
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica1'])
+@pytest.mark.urls(__name__)
+class TestAsyncViews:
+
+    def test_sync_routes_by_default(self):
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/titles/', 'api_yamdb.urls').func
+        ), 'Проверьте, что без ASYNC_VIEWS представления синхронные'
+        assert asyncio.iscoroutinefunction(resolve('/api/v1/titles/').func)
+
+    def test_concurrent_requests_in_pool(self, settings):
+        settings.DATABASE_REPLICAS = {'replica1': 1}
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        for year in range(2000, 2005):
+            Title.objects.create(name='Произведение', year=year)
+        opened = []
+
+        def record(sender, connection, **kwargs):
+            opened.append(
+                (threading.current_thread().name, connection.alias)
+            )
+
+        connection_created.connect(record)
+
+        async def requests():
+            client = AsyncClient()
+            return await asyncio.gather(
+                *(client.get('/api/v1/titles/') for _ in range(10))
+            )
+
+        try:
+            responses = async_to_sync(requests)()
+        finally:
+            connection_created.disconnect(record)
+        assert all(response.status_code == 200 for response in responses)
+        assert all(
+            response.json()['count'] == 5 for response in responses
+        ), 'Проверьте, что асинхронные представления отдают данные'
+        assert opened and all(
+            name.startswith('async-view') for name, _ in opened
+        ), 'Проверьте, что представления работают в потоках пула'
+        assert len(opened) == len(set(opened)), (
+            'Проверьте, что поток пула открывает соединение с каждой базой '
+            'один раз и переиспользует его в следующих запросах'
+        )
+
+        assert set(in_every_thread(db_router.read_database.get)) == {None}, (
+            'Проверьте, что выбор реплики не остается в потоках пула '
+            'после запроса'
+        )
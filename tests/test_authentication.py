@@ -0,0 +1,89 @@
+import pytest
+from api.authentication import token_for_user
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from users.models import User
+
+
+@pytest.fixture
+def user_client(settings):
+    settings.AUTH_STATE_LOCAL_SECONDS = 0
+    user = User.objects.create(username='claims', email='c@yamdb.fake')
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {token_for_user(user).access_token}'
+    )
+    return user, client
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    """Общий для процессов кэш вместо LocMemCache."""
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+
+
+@pytest.mark.django_db(transaction=True)
+class TestClaimsAuthentication:
+
+    def test_no_user_query(self, shared_cache, user_client):
+        user, client = user_client
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert not any(
+            'users_user' in query['sql'] for query in queries.captured_queries
+        ), 'Проверьте, что пользователь берется из токена, а не из БД'
+
+    def test_role_change_applies_to_issued_token(self, user_client):
+        user, client = user_client
+        assert client.get('/api/v1/users/').status_code == 403
+        user.role = 'admin'
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли действует на выданные токены'
+        )
+
+    def test_inactive_user_rejected(self, user_client):
+        user, client = user_client
+        user.is_active = False
+        user.save()
+        assert client.get('/api/v1/titles/').status_code == 401, (
+            'Проверьте, что заблокированный пользователь не проходит '
+            'аутентификацию с выданным токеном'
+        )
+
+    def test_profile_loaded_on_demand(self, user_client):
+        user, client = user_client
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == 'c@yamdb.fake'
+
+    def test_local_cache_reads_changes_from_db(self, user_client):
+        user, client = user_client
+        assert client.get('/api/v1/users/').status_code == 403
+        # Изменение в другом процессе: сигналы этого процесса не
+        # срабатывают, его LocMemCache не сбрасывается.
+        User.objects.filter(pk=user.pk).update(role='admin')
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что при кэше в памяти процесса роль читается из '
+            'БД, а не из кэша, который не сбрасывают другие воркеры'
+        )
+
+    def test_shared_cache_keeps_state(self, shared_cache, user_client):
+        user, client = user_client
+        assert client.get('/api/v1/users/').status_code == 403
+        User.objects.filter(pk=user.pk).update(role='admin')
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get('/api/v1/users/').status_code == 403
+        assert not any(
+            'users_user' in query['sql'] for query in queries.captured_queries
+        ), 'Проверьте, что состояние пользователя берется из общего кэша'
+        user.role = 'admin'
+        user.save()
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что изменение пользователя сбрасывает общий кэш'
+        )
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from api.benchmark import build_report, compare_reports, percentile
+from django.core.management import CommandError, call_command
+from reviews.models import Genre, Review, Title
+from users.models import User
+
+
+def report(**endpoints):
+    return {
+        'endpoints': {
+            name: {'p95_ms': p95, 'queries_per_request': queries}
+            for name, (p95, queries) in endpoints.items()
+        }
+    }
+
+
+class TestBenchmarkReport:
+
+    def test_percentile(self):
+        assert percentile([], 50) is None
+        assert percentile([7], 99) == 7
+        values = [4, 1, 3, 2]
+        assert percentile(values, 0) == 1
+        assert percentile(values, 100) == 4
+        assert percentile(values, 50) == 2.5, (
+            'Проверьте, что процентиль интерполируется между соседними '
+            'значениями'
+        )
+        assert percentile(list(range(101)), 95) == 95
+
+    def test_build_report(self):
+        result = build_report(
+            {'titles': [(0.001, 1), (0.003, 3)]}, {'titles': 1}, 0.5
+        )
+        assert result['requests'] == 2
+        assert result['throughput_rps'] == 4
+        assert result['endpoints']['titles'] == {
+            'requests': 2,
+            'errors': 1,
+            'p50_ms': 2,
+            'p95_ms': 2.9,
+            'p99_ms': 2.98,
+            'throughput_rps': 500,
+            'queries_per_request': 2,
+        }
+
+    def test_compare_reports(self):
+        baseline = report(titles=(10, 2), genres=(5, 1))
+        assert compare_reports(
+            baseline, report(titles=(11.9, 2), genres=(4, 1), new=(99, 9))
+        ) == [], (
+            'Проверьте, что рост p95 в пределах порога и новые эндпоинты '
+            'не считаются регрессией'
+        )
+        regressions = compare_reports(
+            baseline, report(titles=(12.5, 2), genres=(5, 2))
+        )
+        assert len(regressions) == 2, (
+            'Проверьте, что регрессией считается рост p95 больше порога '
+            'и рост числа SQL-запросов'
+        )
+        assert regressions[0].startswith('titles: p95')
+        assert regressions[1].startswith('genres: запросов к БД')
+        assert compare_reports(
+            baseline, report(titles=(12.5, 2)), threshold=0.5
+        ) == [], 'Проверьте, что порог задается параметром threshold'
+
+
+@pytest.mark.django_db
+class TestBenchmarkCommand:
+
+    def test_smoke_run_and_compare(self, tmp_path, capsys):
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        for year in range(2000, 2003):
+            title = Title.objects.create(name=f'Произведение {year}',
+                                         year=year)
+            title.genre.add(genre)
+            Review.objects.create(title=title, author=user, text='Текст',
+                                  score=5)
+        output = str(tmp_path / 'report.json')
+        call_command(
+            'benchmark_api', requests=20, warmup=2, no_cache=True,
+            output=output,
+        )
+        with open(output, encoding='utf-8') as file:
+            saved = json.load(file)
+        assert saved['requests'] == 20
+        assert all(
+            row['errors'] == 0 for row in saved['endpoints'].values()
+        ), 'Проверьте, что сценарии нагрузочного теста отвечают без ошибок'
+        assert 'запросов/с' in capsys.readouterr().out
+
+        for row in saved['endpoints'].values():
+            row['queries_per_request'] = 0
+        baseline = str(tmp_path / 'baseline.json')
+        with open(baseline, 'w', encoding='utf-8') as file:
+            json.dump(saved, file)
+        with pytest.raises(CommandError, match='Регрессии'):
+            call_command(
+                'benchmark_api', requests=20, warmup=2, no_cache=True,
+                compare=baseline,
+            )
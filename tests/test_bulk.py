@@ -0,0 +1,136 @@
+import pytest
+from api import bulk
+from api.authentication import token_for_user
+from api.cache import REVIEWS, TITLES, get_versions
+from django.db.models import QuerySet
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title
+from reviews.utils import rebuild_title_ratings
+from users.models import User
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {token_for_user(user).access_token}'
+    )
+    return client
+
+
+@pytest.fixture(params=['bulk_create', 'save'])
+def insert_path(request, monkeypatch):
+    """Прогоняет тест и через bulk_create, и через сохранение по одному
+    объекту. SQLite в Django 3.2 не возвращает первичные ключи из
+    bulk_create, поэтому путь bulk_create включается подменой проверки;
+    сохранение по одному на этом пути запрещено."""
+    if request.param == 'bulk_create':
+        monkeypatch.setattr(bulk, 'returns_bulk_pks', lambda model: True)
+
+        def save(*args, **kwargs):
+            raise AssertionError('Объект сохранен мимо bulk_create')
+
+        monkeypatch.setattr(Review, 'save', save)
+    else:
+        monkeypatch.setattr(bulk, 'returns_bulk_pks', lambda model: False)
+    return request.param
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBulkCreate:
+
+    def test_titles_bulk_admin_only(self):
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        items = [
+            {'name': 'Первое', 'year': 2000, 'genre': ['drama'],
+             'category': 'movie'},
+            {'name': 'Второе', 'year': 2001, 'genre': ['nope'],
+             'category': 'movie'},
+        ]
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        response = client_for(user).post(
+            '/api/v1/titles/bulk/', items, format='json'
+        )
+        assert response.status_code == 403, (
+            'Проверьте, что массово создавать произведения может только '
+            'администратор'
+        )
+        admin = User.objects.create(
+            username='admin', email='a@yamdb.fake', role='admin'
+        )
+        response = client_for(admin).post(
+            '/api/v1/titles/bulk/', items, format='json'
+        )
+        assert response.status_code == 207
+        first, second = response.json()
+        assert first['status'] == 201
+        assert first['data']['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert second['status'] == 400 and 'genre' in second['errors']
+        assert Title.objects.get().genre.count() == 1
+
+    def test_reviews_bulk_updates_rating_and_rejects_duplicates(
+        self, insert_path
+    ):
+        titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(2)
+        ]
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        items = [
+            {'title': titles[0].pk, 'text': 'Хорошо', 'score': 8},
+            {'title': titles[1].pk, 'text': 'Плохо', 'score': 2},
+            {'title': titles[0].pk, 'text': 'Еще раз', 'score': 10},
+        ]
+        versions = get_versions((REVIEWS, TITLES))
+        response = client_for(user).post(
+            '/api/v1/reviews/bulk/', items, format='json'
+        )
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == [
+            201, 201, 400
+        ], 'Проверьте, что повторный отзыв в массиве отклоняется'
+        assert Review.objects.count() == 2
+        titles[0].refresh_from_db()
+        assert titles[0].rating == 8, (
+            'Проверьте, что рейтинг пересчитывается после массовой записи'
+        )
+        assert titles[0].reviews_count == 1
+        titles[1].refresh_from_db()
+        assert (titles[1].rating, titles[1].reviews_count) == (2, 1)
+        assert all(
+            new > old for new, old in zip(
+                get_versions((REVIEWS, TITLES)), versions
+            )
+        ), (
+            'Проверьте, что после массовой записи сбрасываются версии '
+            'кэша отзывов и произведений'
+        )
+
+    def test_reviews_bulk_locks_titles_before_rebuild(self, monkeypatch):
+        title = Title.objects.create(name='Произведение', year=2000)
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        events = []
+        select_for_update = QuerySet.select_for_update
+
+        def lock(queryset, *args, **kwargs):
+            if queryset.model is Title:
+                events.append('lock')
+            return select_for_update(queryset, *args, **kwargs)
+
+        def rebuild(titles):
+            events.append('rebuild')
+            return rebuild_title_ratings(titles)
+
+        monkeypatch.setattr(bulk, 'returns_bulk_pks', lambda model: True)
+        monkeypatch.setattr(QuerySet, 'select_for_update', lock)
+        monkeypatch.setattr('api.views.rebuild_title_ratings', rebuild)
+        response = client_for(user).post(
+            '/api/v1/reviews/bulk/',
+            [{'title': title.pk, 'text': 'Хорошо', 'score': 8}],
+            format='json',
+        )
+        assert response.status_code == 201
+        assert events == ['lock', 'rebuild'], (
+            'Проверьте, что перед пересчетом агрегатов строки произведений '
+            'блокируются, чтобы не потерять параллельные изменения'
+        )
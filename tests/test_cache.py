@@ -0,0 +1,58 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from reviews.models import Genre
+
+
+@pytest.mark.django_db(transaction=True)
+class TestResponseCache:
+
+    def test_genres_cache_invalidated_on_save(self):
+        cache.clear()
+        client = APIClient()
+        Genre.objects.create(name='Драма', slug='drama')
+        assert client.get('/api/v1/genres/').json()['count'] == 1
+        Genre.objects.create(name='Комедия', slug='comedy')
+        assert client.get('/api/v1/genres/').json()['count'] == 2, (
+            'Проверьте, что кэш ответов сбрасывается при изменении жанров'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConditionalGet:
+
+    def test_not_modified_until_version_bump(self):
+        cache.clear()
+        client = APIClient()
+        response = client.get('/api/v1/genres/')
+        etag = response['ETag']
+        assert client.get(
+            '/api/v1/genres/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304, (
+            'Проверьте, что на совпадающий If-None-Match возвращается 304'
+        )
+        assert client.get(
+            '/api/v1/genres/',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        ).status_code == 304, (
+            'Проверьте, что на If-Modified-Since не раньше Last-Modified '
+            'возвращается 304'
+        )
+
+        Genre.objects.create(name='Драма', slug='drama')
+        response = client.get('/api/v1/genres/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что после изменения жанров меняется ETag'
+        )
+
+    def test_etag_depends_on_format_and_host(self):
+        client = APIClient()
+        etag = client.get('/api/v1/genres/')['ETag']
+        html = client.get('/api/v1/genres/', HTTP_ACCEPT='text/html')
+        assert html['ETag'] != etag, (
+            'Проверьте, что у ответов в JSON и в браузерном API разный ETag'
+        )
+        assert 'Accept' in html['Vary']
+        assert client.get(
+            '/api/v1/genres/', HTTP_HOST='other.testserver'
+        )['ETag'] != etag, 'Проверьте, что ETag зависит от хоста'
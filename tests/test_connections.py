@@ -0,0 +1,62 @@
+import runpy
+from os.path import dirname, join
+
+import pytest
+from django.db import connection
+from prometheus_client import REGISTRY
+from rest_framework.test import APIClient
+
+SETTINGS_PATH = join(
+    dirname(dirname(__file__)), 'api_yamdb', 'api_yamdb', 'settings.py'
+)
+
+
+def health_check_failures():
+    return REGISTRY.get_sample_value(
+        'yamdb_db_health_check_failures_total', {'alias': 'default'}
+    ) or 0
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPersistentConnections:
+
+    def test_broken_connection_replaced_before_view(
+        self, settings, monkeypatch
+    ):
+        settings.DB_CONN_HEALTH_CHECKS = True
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        connection.ensure_connection()
+        broken = connection.connection
+        failures = health_check_failures()
+        closed = []
+
+        def close():
+            # Тестовая база в памяти пропадет вместе с последним
+            # соединением, поэтому соединение только отсоединяется.
+            closed.append(connection.connection)
+            connection.connection = None
+
+        monkeypatch.setattr(connection, 'is_usable', lambda: False)
+        monkeypatch.setattr(connection, 'close', close)
+        response = APIClient().get('/api/v1/genres/')
+
+        assert closed == [broken], (
+            'Проверьте, что разорванное постоянное соединение закрывается '
+            'в начале запроса'
+        )
+        assert response.status_code == 200
+        assert connection.connection is not None and (
+            connection.connection is not broken
+        ), 'Проверьте, что представление работает на новом соединении'
+        assert health_check_failures() == failures + 1
+        broken.close()
+
+    def test_conn_max_age_from_environment(self, monkeypatch):
+        monkeypatch.setenv('DB_CONN_MAX_AGE', '0')
+        databases = runpy.run_path(SETTINGS_PATH)['DATABASES']
+        assert databases['default']['CONN_MAX_AGE'] == 0, (
+            'Проверьте, что CONN_MAX_AGE задается переменной DB_CONN_MAX_AGE'
+        )
+        monkeypatch.delenv('DB_CONN_MAX_AGE')
+        databases = runpy.run_path(SETTINGS_PATH)['DATABASES']
+        assert databases['default']['CONN_MAX_AGE'] == 60
@@ -0,0 +1,167 @@
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from api.authentication import token_for_user
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.core.asgi import get_asgi_application
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from reviews.exporter import EXPORT_TABLES, iter_table_rows
+from reviews.importer import CsvLoader
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {token_for_user(user).access_token}'
+    )
+    return client
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_export_streams_loader_columns(self):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        title = Title.objects.create(
+            name='Фильм, с запятой', year=2000, category=category
+        )
+        admin = User.objects.create(
+            username='admin', email='a@yamdb.fake', role='admin'
+        )
+        Review.objects.create(title=title, author=admin, text='Да', score=7)
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        assert client_for(user).get(
+            '/api/v1/export/titles.csv'
+        ).status_code == 403, 'Проверьте, что выгрузка доступна только админу'
+
+        response = client_for(admin).get('/api/v1/export/titles.csv')
+        assert response.status_code == 200
+        assert response.streaming, 'Проверьте, что выгрузка идет потоком'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == (
+            'id,name,year,category,description,reviews_count,score_sum,'
+            'rating,score_counts'
+        )
+        assert lines[1] == (
+            f'{title.pk},"Фильм, с запятой",2000,{category.pk},,1,7,7.0,'
+            '"[0, 0, 0, 0, 0, 0, 1, 0, 0, 0]"'
+        )
+
+        response = client_for(admin).get('/api/v1/export/review.ndjson')
+        row = json.loads(b''.join(response.streaming_content))
+        assert row['title_id'] == title.pk and row['author'] == admin.pk
+        assert client_for(admin).get(
+            '/api/v1/export/nope.csv'
+        ).status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+class TestExportRoundTrip:
+
+    def test_csv_export_loads_back(self, monkeypatch, tmp_path):
+        category = Category.objects.create(name='Фильм', slug='movie')
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        title = Title.objects.create(
+            name='Фильм, с "кавычками"', year=2000, category=category,
+            description='Строка\nвторая строка',
+        )
+        title.genre.add(genre)
+        Title.objects.create(name='Без категории', year=2001)
+        admin = User.objects.create(
+            username='admin', email='a@yamdb.fake', role='admin',
+            is_staff=True, is_superuser=True,
+        )
+        user = User.objects.create(
+            username='user', email='u@yamdb.fake', bio='О себе',
+            is_active=False,
+        )
+        review = Review.objects.create(
+            title=title, author=user, text='Хорошо', score=8
+        )
+        Review.objects.create(title=title, author=admin, text='Так', score=5)
+        Comment.objects.create(review=review, author=admin, text='Согласен')
+        Review.objects.filter(pk=review.pk).update(
+            pub_date=datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        )
+        Comment.objects.update(
+            pub_date=datetime(2021, 6, 7, 8, 9, 10, tzinfo=timezone.utc)
+        )
+        exported = {
+            name: list(iter_table_rows(name)) for name in EXPORT_TABLES
+        }
+        user_flags = list(User.objects.order_by('id').values_list(
+            'username', 'is_active', 'is_staff', 'is_superuser', 'date_joined'
+        ))
+        call_command(
+            'export_data', output_dir=str(tmp_path), stdout=io.StringIO()
+        )
+
+        for model, _ in reversed(list(EXPORT_TABLES.values())):
+            model.objects.all().delete()
+        monkeypatch.setattr('reviews.importer.CSV_FILES_DIR', str(tmp_path))
+        tables = CsvLoader(stdout=lambda message: None).load_all()
+
+        assert all(table.error is None for table in tables.values())
+        for name in EXPORT_TABLES:
+            assert list(iter_table_rows(name)) == exported[name], (
+                f'Проверьте, что таблица {name} после выгрузки в csv и '
+                'загрузки обратно не меняется, включая даты и флаги '
+                'пользователей'
+            )
+        assert list(User.objects.order_by('id').values_list(
+            'username', 'is_active', 'is_staff', 'is_superuser', 'date_joined'
+        )) == user_flags
+
+
+async def asgi_get(path, token):
+    """GET через ASGI-обработчик Django: тело потокового ответа
+    читается в цикле событий, как под uvicorn."""
+    communicator = ApplicationCommunicator(get_asgi_application(), {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [
+            (b'host', b'testserver'),
+            (b'authorization', f'Bearer {token}'.encode()),
+        ],
+    })
+    await communicator.send_input({'type': 'http.request', 'body': b''})
+    start = await communicator.receive_output(5)
+    body = b''
+    while True:
+        message = await communicator.receive_output(5)
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return start['status'], body
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsgiExport:
+
+    def test_export_streams_under_asgi(self):
+        Category.objects.create(name='Фильм', slug='movie')
+        Category.objects.create(name='Книга', slug='book')
+        admin = User.objects.create(
+            username='admin', email='a@yamdb.fake', role='admin'
+        )
+        status, body = async_to_sync(asgi_get)(
+            '/api/v1/export/category.csv', token_for_user(admin).access_token
+        )
+        assert status == 200, (
+            'Проверьте, что выгрузка работает в режиме ASGI'
+        )
+        assert body.decode().splitlines() == [
+            'id,name,slug',
+            *(
+                f'{pk},{name},{slug}' for pk, name, slug in
+                Category.objects.order_by('id')
+                .values_list('id', 'name', 'slug')
+            ),
+        ]
@@ -0,0 +1,224 @@
+import csv
+import os
+import threading
+import time
+
+import pytest
+from django.utils.dateparse import parse_datetime
+from reviews.importer import (UPSERT_IGNORE, UPSERT_UPDATE, Checkpoint,
+                              CsvLoader)
+from reviews.models import Category, Comment, Review, Title
+from users.models import User
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'api_yamdb', 'static', 'data',
+)
+
+
+FILES = {
+    'category': Category,
+    'titles': Title,
+    'users': User,
+    'review': Review,
+}
+
+
+def write_csv(directory, file_name, rows):
+    path = os.path.join(directory, file_name + '.csv')
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        csv.writer(file).writerows(rows)
+
+
+def write_titles(directory, year):
+    write_csv(directory, 'titles', [
+        ('id', 'name', 'year', 'category'),
+        (1, 'Первое', 2000, 1),
+        (2, 'Второе', year, 1),
+    ])
+
+
+def write_tables(directory, year):
+    write_csv(directory, 'category', [
+        ('id', 'name', 'slug'), (1, 'Фильм', 'movie'),
+    ])
+    write_titles(directory, year)
+    write_csv(directory, 'users', [
+        ('id', 'username', 'email'), (1, 'user', 'user@yamdb.fake'),
+    ])
+    write_csv(directory, 'review', [
+        ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+        (1, 1, 'Текст', 1, 5, '2020-01-01T00:00:00Z'),
+        (2, 2, 'Текст', 1, 7, '2020-01-02T00:00:00Z'),
+    ])
+
+
+def read_csv(file_name):
+    path = os.path.join(DATA_DIR, file_name + '.csv')
+    with open(path, encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCsvLoader:
+
+    def test_keeps_csv_dates(self, monkeypatch):
+        monkeypatch.setattr('reviews.importer.CSV_FILES_DIR', DATA_DIR)
+        CsvLoader(stdout=lambda message: None).load_all()
+
+        for model, file_name in ((Review, 'review'), (Comment, 'comments')):
+            dates = dict(model.objects.values_list('id', 'pub_date'))
+            rows = read_csv(file_name)
+            assert len(dates) == len(rows)
+            for row in rows:
+                assert dates[int(row['id'])] == parse_datetime(
+                    row['pub_date']
+                ), (
+                    'Проверьте, что при загрузке pub_date берется из '
+                    'csv-файла, а не заменяется временем загрузки'
+                )
+
+    def test_resumes_after_parent_table_is_fixed(self, monkeypatch, tmp_path):
+        monkeypatch.setattr('reviews.importer.CSV_FILES_DIR', str(tmp_path))
+        checkpoint_path = str(tmp_path / 'checkpoint.json')
+        write_tables(tmp_path, year='не число')
+
+        tables = CsvLoader(
+            checkpoint=Checkpoint(checkpoint_path), stdout=lambda _: None
+        ).load_all(FILES)
+        assert tables['titles'].error is not None
+        assert tables['review'].error is not None, (
+            'Проверьте, что таблица не загружается, если ее родительская '
+            'таблица загружена с ошибкой'
+        )
+        assert not Review.objects.exists()
+        assert not Checkpoint(checkpoint_path).is_done('review')
+
+        write_titles(tmp_path, year=2001)
+        tables = CsvLoader(
+            checkpoint=Checkpoint(checkpoint_path), stdout=lambda _: None
+        ).load_all(FILES)
+        assert all(table.error is None for table in tables.values())
+        assert tables['category'].skipped and tables['users'].skipped
+        assert (Title.objects.count(), Review.objects.count()) == (2, 2), (
+            'Проверьте, что после исправления родительской таблицы '
+            'повторный запуск загружает ее и зависимые таблицы'
+        )
+        assert not os.path.exists(checkpoint_path)
+
+    def test_missing_parent_stops_table(self, monkeypatch, tmp_path):
+        monkeypatch.setattr('reviews.importer.CSV_FILES_DIR', str(tmp_path))
+        checkpoint_path = str(tmp_path / 'checkpoint.json')
+        write_tables(tmp_path, year=2001)
+        write_csv(tmp_path, 'review', [
+            ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+            (1, 1, 'Текст', 1, 5, '2020-01-01T00:00:00Z'),
+            (2, 3, 'Текст', 1, 7, '2020-01-02T00:00:00Z'),
+        ])
+
+        tables = CsvLoader(
+            batch_size=1,
+            checkpoint=Checkpoint(checkpoint_path),
+            stdout=lambda _: None,
+        ).load_all(FILES)
+        assert 'id=3' in str(tables['review'].error)
+        checkpoint = Checkpoint(checkpoint_path)
+        assert not checkpoint.is_done('review') and (
+            checkpoint.rows('review') == 1
+        ), (
+            'Проверьте, что строка с несуществующим родителем не '
+            'считается загруженной'
+        )
+
+    @pytest.mark.parametrize('upsert, first_name', [
+        (UPSERT_IGNORE, 'Первое'),
+        (UPSERT_UPDATE, 'Исправлено'),
+    ])
+    def test_rerun_with_upsert(
+        self, monkeypatch, tmp_path, upsert, first_name
+    ):
+        monkeypatch.setattr('reviews.importer.CSV_FILES_DIR', str(tmp_path))
+        write_tables(tmp_path, year=2001)
+        CsvLoader(stdout=lambda _: None).load_all(FILES)
+        write_csv(tmp_path, 'titles', [
+            ('id', 'name', 'year', 'category'),
+            (1, 'Исправлено', 2000, 1),
+            (2, 'Второе', 2001, 1),
+            (3, 'Третье', 2002, 1),
+        ])
+        write_csv(tmp_path, 'review', [
+            ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+            (1, 1, 'Текст', 1, 5, '2020-01-01T00:00:00Z'),
+            (2, 2, 'Текст', 1, 7, '2020-01-02T00:00:00Z'),
+            (3, 3, 'Текст', 1, 9, ''),
+        ])
+
+        tables = CsvLoader(upsert=upsert, stdout=lambda _: None).load_all(
+            FILES
+        )
+        assert all(table.error is None for table in tables.values()), (
+            'Проверьте, что повторная загрузка с --upsert не падает на '
+            'существующих строках'
+        )
+        assert dict(Title.objects.values_list('id', 'name')) == {
+            1: first_name, 2: 'Второе', 3: 'Третье'
+        }, (
+            'Проверьте, что --upsert ignore пропускает существующие '
+            'строки, а --upsert update обновляет их'
+        )
+        assert Review.objects.count() == 3
+        assert Review.objects.get(pk=1).pub_date == parse_datetime(
+            '2020-01-01T00:00:00Z'
+        )
+        assert Review.objects.get(pk=3).pub_date is not None, (
+            'Проверьте, что пустая дата заменяется временем загрузки'
+        )
+        assert Title.objects.get(pk=3).rating == 9
+
+    def test_thread_pool_respects_dependencies(self, monkeypatch, tmp_path):
+        monkeypatch.setattr('reviews.importer.CSV_FILES_DIR', str(tmp_path))
+        write_tables(tmp_path, year=2001)
+        loader = CsvLoader(batch_size=1, stdout=lambda _: None)
+        # SQLite не допускает параллельной записи, поэтому пул включается
+        # после проверки в конструкторе, а запись пачек подменяется.
+        loader.workers = 4
+        events = []
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def write_batch(model, objects):
+            with lock:
+                events.append(('start', model, threading.current_thread()))
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.02)
+            loader.id_map.add(model, (int(obj.pk) for obj in objects))
+            with lock:
+                running[0] -= 1
+                events.append(('end', model, None))
+            return len(objects)
+
+        monkeypatch.setattr(loader, 'write_batch', write_batch)
+        tables = loader.load_all(FILES)
+
+        assert all(table.loaded for table in tables.values())
+        assert threading.main_thread() not in {
+            thread for kind, _, thread in events if kind == 'start'
+        }, 'Проверьте, что пачки записываются в потоках пула'
+        assert running[1] > 1, (
+            'Проверьте, что пачки записываются параллельно'
+        )
+        for child, parent in ((Title, Category), (Review, Title),
+                              (Review, User)):
+            first_start = min(
+                index for index, (kind, model, _) in enumerate(events)
+                if kind == 'start' and model is child
+            )
+            last_end = max(
+                index for index, (kind, model, _) in enumerate(events)
+                if kind == 'end' and model is parent
+            )
+            assert last_end < first_start, (
+                f'Проверьте, что {child.__name__} загружается только после '
+                f'записи всех пачек {parent.__name__}'
+            )
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from reviews.leaderboards import refresh_leaderboards
+from reviews.models import Category, Genre, Review, Title
+from rest_framework.test import APIClient
+from users.models import User
+
+
+@pytest.fixture(autouse=True)
+def leaderboard_settings(settings):
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+    settings.LEADERBOARD_MIN_REVIEWS = 2
+
+
+def review(title, author, score):
+    return Review.objects.create(
+        title=title, author=author, text='Текст', score=score
+    )
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_bayesian_rating_and_scopes(self):
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        single = Title.objects.create(name='Один отзыв', year=2000)
+        popular = Title.objects.create(
+            name='Много отзывов', year=2000, category=movie
+        )
+        popular.genre.set([drama])
+        users = [
+            User.objects.create(username=f'user{i}', email=f'{i}@yamdb.fake')
+            for i in range(4)
+        ]
+        weak = Title.objects.create(name='Слабое', year=2000)
+        review(single, users[0], 10)
+        for user in users:
+            review(popular, user, 9)
+            review(weak, user, 2)
+        refresh_leaderboards()
+
+        client = APIClient()
+        results = client.get('/api/v1/leaderboards/best/').json()['results']
+        assert [item['title']['id'] for item in results] == [
+            popular.pk, single.pk, weak.pk
+        ], (
+            'Проверьте, что произведение с одним отзывом не обгоняет '
+            'произведение с большим числом высоких оценок'
+        )
+        for query in ('genre=drama', 'category=movie'):
+            results = client.get(
+                f'/api/v1/leaderboards/best/?{query}'
+            ).json()['results']
+            assert [item['title']['id'] for item in results] == [
+                popular.pk
+            ], 'Проверьте срезы рейтинга по жанру и категории'
+
+    def test_trending_prefers_recent_reviews(self):
+        old = Title.objects.create(name='Старое', year=2000)
+        new = Title.objects.create(name='Новое', year=2000)
+        author = User.objects.create(username='user', email='u@yamdb.fake')
+        review(old, author, 10)
+        review(new, author, 8)
+        Review.objects.filter(title=old).update(
+            pub_date=timezone.now() - timedelta(days=7)
+        )
+        refresh_leaderboards()
+        results = APIClient().get(
+            '/api/v1/leaderboards/trending/'
+        ).json()['results']
+        assert results[0]['title']['id'] == new.pk, (
+            'Проверьте, что вес оценки убывает со временем'
+        )
@@ -0,0 +1,129 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from django.core.management import call_command
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+from rest_framework.test import APIClient
+
+from .conftest import root_dir
+
+LABELS = {'route': 'genres-list', 'method': 'GET'}
+
+# Код воркера: Django с метриками в общем каталоге.
+WORKER_CODE = """
+import django
+django.setup()
+from api.metrics import REQUESTS
+REQUESTS.labels('genres-list', 'GET', '200').inc()
+"""
+SCRAPE_CODE = """
+import django
+django.setup()
+from django.test import RequestFactory
+from api.metrics import metrics_view
+print(metrics_view(RequestFactory().get('/metrics')).content.decode())
+"""
+
+
+def sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def run_process(code, directory):
+    """Выполняет код в отдельном процессе с метриками в directory."""
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='api_yamdb.settings',
+        PROMETHEUS_MULTIPROC_DIR=directory,
+        METRICS_ENABLED='true',
+    )
+    return subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=os.path.join(root_dir, 'api_yamdb'),
+        env=env,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_request_is_counted(self, settings):
+        settings.METRICS_ENABLED = True
+        requests = sample(
+            'yamdb_http_requests_total', dict(LABELS, status='200')
+        )
+        latency = sample('yamdb_http_request_duration_seconds_count', LABELS)
+        client = APIClient()
+        assert client.get('/api/v1/genres/').status_code == 200
+        assert sample(
+            'yamdb_http_requests_total', dict(LABELS, status='200')
+        ) == requests + 1, 'Проверьте, что запрос учитывается в счетчике'
+        assert sample(
+            'yamdb_http_request_duration_seconds_count', LABELS
+        ) == latency + 1, (
+            'Проверьте, что время запроса попадает в гистограмму'
+        )
+
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        families = {
+            family.name: family
+            for family in text_string_to_metric_families(
+                response.content.decode()
+            )
+        }
+        assert 'yamdb_http_requests' in families, (
+            'Проверьте, что /metrics отдает метрики в формате Prometheus'
+        )
+
+    def test_disabled_by_default(self, settings):
+        settings.METRICS_ENABLED = False
+        requests = sample(
+            'yamdb_http_requests_total', dict(LABELS, status='200')
+        )
+        client = APIClient()
+        client.get('/api/v1/genres/')
+        assert sample(
+            'yamdb_http_requests_total', dict(LABELS, status='200')
+        ) == requests, 'Проверьте, что метрики выключены по умолчанию'
+        assert client.get('/metrics').status_code == 404
+
+    def test_aggregated_across_processes(self, tmp_path):
+        # Каталога еще нет: процесс вне gunicorn должен создать его сам.
+        directory = str(tmp_path / 'prometheus')
+        for _ in range(2):
+            run_process(WORKER_CODE, directory)
+        families = {
+            family.name: family
+            for family in text_string_to_metric_families(
+                run_process(SCRAPE_CODE, directory)
+            )
+        }
+        values = [
+            sample.value
+            for sample in families['yamdb_http_requests'].samples
+            if sample.name == 'yamdb_http_requests_total'
+            and sample.labels == dict(LABELS, status='200')
+        ]
+        assert values == [2], (
+            'Проверьте, что /metrics суммирует метрики всех процессов '
+            'из каталога PROMETHEUS_MULTIPROC_DIR'
+        )
+
+    def test_mailer_serves_metrics(self, monkeypatch):
+        ports = []
+        monkeypatch.setattr(
+            'api.management.commands.send_queued_mail.start_http_server',
+            ports.append,
+        )
+        call_command('send_queued_mail', metrics_port=9100)
+        assert ports == [9100], (
+            'Проверьте, что send_queued_mail --metrics-port отдает метрики '
+            'отправки писем по HTTP'
+        )
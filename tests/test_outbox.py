@@ -0,0 +1,158 @@
+from datetime import timedelta
+from smtplib import SMTPException
+
+import pytest
+from api import outbox
+from api.models import OutgoingEmail
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+
+class FakeConnection:
+    """Соединение с почтовым сервером: запоминает письма и отказывает
+    адресатам из fail."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.opened = 0
+        self.sent = []
+
+    def open(self):
+        self.opened += 1
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        for message in messages:
+            if message.to[0] in self.fail:
+                raise SMTPException('Сервер недоступен')
+            self.sent.append(message.to[0])
+        return len(messages)
+
+
+class FakeMailServer:
+    """Почтовый сервер: открытые соединения и отклоняемые адреса."""
+
+    def __init__(self):
+        self.fail = set()
+        self.connections = []
+
+    def get_connection(self):
+        self.connections.append(FakeConnection(self.fail))
+        return self.connections[-1]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeMailServer()
+    monkeypatch.setattr(outbox, 'get_connection', server.get_connection)
+    monkeypatch.setattr(outbox.random, 'uniform', lambda low, high: 1)
+    return server
+
+
+def queue(*addresses):
+    return [
+        outbox.enqueue('Тема', 'Код: 123', 'yamdb@yamdb.fake', address)
+        for address in addresses
+    ]
+
+
+def make_due(email):
+    OutgoingEmail.objects.filter(pk=email.pk).update(
+        next_attempt_at=timezone.now()
+    )
+
+
+@pytest.mark.django_db
+class TestMailOutbox:
+
+    def test_signup_queues_mail(self):
+        response = APIClient().post(
+            '/api/v1/auth/signup/',
+            {'username': 'queued', 'email': 'queued@yamdb.fake'},
+        )
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что регистрация не отправляет письмо в запросе, '
+            'а ставит его в очередь'
+        )
+        call_command('send_queued_mail')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что send_queued_mail отправляет письма из очереди'
+        )
+        assert mail.outbox[0].to == ['queued@yamdb.fake']
+
+    def test_one_connection_per_batch(self, server):
+        queue('a@yamdb.fake', 'b@yamdb.fake', 'c@yamdb.fake')
+        assert outbox.send_batch() == (3, 0)
+        connections = server.connections
+        assert len(connections) == 1 and connections[0].opened == 1, (
+            'Проверьте, что пачка писем отправляется через одно соединение'
+        )
+        assert sorted(connections[0].sent) == [
+            'a@yamdb.fake', 'b@yamdb.fake', 'c@yamdb.fake'
+        ]
+        assert set(
+            OutgoingEmail.objects.values_list('status', flat=True)
+        ) == {OutgoingEmail.SENT}
+
+    def test_retry_with_backoff(self, server):
+        server.fail.add('bad@yamdb.fake')
+        bad, good = queue('bad@yamdb.fake', 'good@yamdb.fake')
+        started = timezone.now()
+        assert outbox.send_batch() == (1, 1)
+        bad.refresh_from_db()
+        assert bad.status == OutgoingEmail.PENDING and bad.attempts == 1
+        assert bad.last_error == 'Сервер недоступен'
+        delay = bad.next_attempt_at - started
+        assert timedelta(seconds=30) <= delay < timedelta(seconds=31), (
+            'Проверьте, что первая повторная попытка откладывается на '
+            'RETRY_BASE_DELAY секунд'
+        )
+        assert outbox.send_batch() == (0, 0), (
+            'Проверьте, что письмо не отправляется раньше срока'
+        )
+
+        make_due(bad)
+        started = timezone.now()
+        outbox.send_batch()
+        bad.refresh_from_db()
+        delay = bad.next_attempt_at - started
+        assert timedelta(seconds=60) <= delay < timedelta(seconds=61), (
+            'Проверьте, что задержка растет экспоненциально'
+        )
+
+    def test_failed_after_max_attempts(self, server):
+        server.fail.add('bad@yamdb.fake')
+        email, = queue('bad@yamdb.fake')
+        for _ in range(outbox.MAX_ATTEMPTS):
+            make_due(email)
+            assert outbox.send_batch() == (0, 1)
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после MAX_ATTEMPTS попыток письмо помечается '
+            'как неотправленное'
+        )
+        assert email.attempts == outbox.MAX_ATTEMPTS
+        make_due(email)
+        assert outbox.send_batch() == (0, 0), (
+            'Проверьте, что неотправленное письмо больше не отправляется'
+        )
+
+    def test_purge_sent(self, server):
+        old, fresh, pending = queue(
+            'old@yamdb.fake', 'fresh@yamdb.fake', 'pending@yamdb.fake'
+        )
+        OutgoingEmail.objects.filter(pk__in=[old.pk, fresh.pk]).update(
+            status=OutgoingEmail.SENT, sent_at=timezone.now()
+        )
+        OutgoingEmail.objects.filter(pk=old.pk).update(
+            sent_at=timezone.now() - outbox.SENT_RETENTION * 2
+        )
+        assert outbox.purge_sent() == 1
+        assert set(OutgoingEmail.objects.values_list('to', flat=True)) == {
+            'fresh@yamdb.fake', 'pending@yamdb.fake'
+        }, 'Проверьте, что удаляются только давно отправленные письма'
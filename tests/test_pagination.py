@@ -0,0 +1,71 @@
+import base64
+import json
+
+import pytest
+from rest_framework.test import APIClient
+from reviews.models import Title
+
+
+def cursor(values, reverse=False):
+    data = json.dumps({'v': values, 'r': int(reverse)})
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def walk(self, client, url, link):
+        """id записей по ссылкам link и последняя страница."""
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            page = response.json()
+            ids.extend(
+                title['id'] for title in (
+                    page['results'] if link == 'next'
+                    else reversed(page['results'])
+                )
+            )
+            url = page[link]
+        return ids, page
+
+    def test_walk_both_ways_with_ties(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        # Одинаковые год и название: порядок разрешает id.
+        for year, name in [(2000, 'Б'), (2001, 'А'), (2000, 'А')] * 3:
+            Title.objects.create(name=name, year=year)
+        expected = list(
+            Title.objects.order_by('-year', 'name', 'id')
+            .values_list('id', flat=True)
+        )
+        client = APIClient()
+
+        forward, last_page = self.walk(
+            client, '/api/v1/titles/?page_size=2', 'next'
+        )
+        assert forward == expected, (
+            'Проверьте, что при переходе по ссылкам next записи не '
+            'повторяются и не пропускаются при равных ключах сортировки'
+        )
+
+        backward, _ = self.walk(client, last_page['previous'], 'previous')
+        assert backward == list(reversed(expected[:-1])), (
+            'Проверьте, что при переходе по ссылкам previous записи не '
+            'повторяются и не пропускаются при равных ключах сортировки'
+        )
+
+    @pytest.mark.parametrize('values', [
+        ['abc', 'x', 'y'],
+        [2000, 'А'],
+        [None, 'А', 1],
+        [[2000], 'А', 1],
+    ])
+    def test_invalid_cursor(self, values):
+        response = APIClient().get(
+            '/api/v1/titles/?cursor=' + cursor(values)
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что на курсор с неверными значениями возвращается '
+            'ответ 404, а не ошибка сервера'
+        )
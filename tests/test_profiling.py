@@ -0,0 +1,50 @@
+import pytest
+from api.middleware import ProfiledMiddleware
+from api.profiling import (RequestProfile, install_serializer_timer,
+                           profile_request)
+from api.serializers import GenreSerializer
+from rest_framework.test import APIClient
+from reviews.models import Genre
+
+
+@pytest.mark.django_db
+class TestRequestProfiling:
+
+    def test_server_timing_header(self, settings):
+        settings.REQUEST_PROFILING = True
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        response = APIClient().get('/api/v1/genres/')
+        assert 'db;dur=' in response.get('Server-Timing', ''), (
+            'Проверьте, что при REQUEST_PROFILING=true ответ содержит '
+            'заголовок Server-Timing со временем запросов к БД'
+        )
+
+    def test_disabled_by_default(self, settings):
+        settings.REQUEST_PROFILING = False
+        response = APIClient().get('/api/v1/genres/')
+        assert not response.has_header('Server-Timing'), (
+            'Проверьте, что профилирование выключено по умолчанию'
+        )
+
+    def test_stats_for_admin_only(self):
+        response = APIClient().get('/api/v1/profiling/')
+        assert response.status_code == 401, (
+            'Проверьте, что статистика профилирования недоступна анониму'
+        )
+
+    def test_serializer_time(self):
+        install_serializer_timer()
+        genres = [Genre(name=f'Жанр {i}', slug=f'genre{i}') for i in range(50)]
+        with profile_request(RequestProfile()) as profile:
+            GenreSerializer(genres, many=True).data
+        assert profile.serializer_time > 0, (
+            'Проверьте, что при профилировании учитывается время '
+            'сериализации'
+        )
+
+    def test_base_middleware_returns_response(self):
+        middleware = ProfiledMiddleware(lambda request: 'response')
+        assert middleware(None) == 'response', (
+            'Проверьте, что ProfiledMiddleware по умолчанию возвращает '
+            'ответ без изменений'
+        )
@@ -0,0 +1,144 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title
+from users.models import User
+
+
+def create_titles(count):
+    category = Category.objects.create(name='Фильм', slug='movie')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    for i in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+def count_queries(url):
+    client = APIClient()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200, (
+        f'Проверьте, что запрос `{url}` возвращает статус 200'
+    )
+    return len(context)
+
+
+@pytest.fixture(autouse=True)
+def disable_response_cache(settings):
+    settings.RESPONSE_CACHE_TIMEOUT = 0
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    def test_titles_list_queries_do_not_depend_on_page_size(self):
+        create_titles(1)
+        one_title = count_queries('/api/v1/titles/')
+        for i in range(4):
+            title = Title.objects.create(name=f'Еще {i}', year=2001)
+            title.genre.set(Genre.objects.all())
+        full_page = count_queries('/api/v1/titles/')
+        assert one_title == full_page, (
+            'Проверьте, что количество запросов к базе при получении списка '
+            'произведений не зависит от количества произведений на странице'
+        )
+        assert full_page <= 3, (
+            'Проверьте, что жанры и категории произведений загружаются '
+            'через select_related и prefetch_related'
+        )
+
+    def test_title_detail_queries(self):
+        create_titles(1)
+        title = Title.objects.get()
+        assert count_queries(f'/api/v1/titles/{title.pk}/') <= 2, (
+            'Проверьте, что получение произведения не выполняет '
+            'лишних запросов к базе'
+        )
+
+
+@pytest.mark.django_db
+class TestReviewQueries:
+
+    def test_reviews_list_queries_do_not_depend_on_page_size(self):
+        create_titles(2)
+        first, second = Title.objects.all()
+        for title, count in ((first, 1), (second, 5)):
+            for i in range(count):
+                author = User.objects.create(
+                    username=f'author-{title.pk}-{i}',
+                    email=f'author-{title.pk}-{i}@yamdb.fake',
+                )
+                Review.objects.create(
+                    title=title, author=author, text='Текст', score=5
+                )
+        assert count_queries(
+            f'/api/v1/titles/{first.pk}/reviews/'
+        ) == count_queries(f'/api/v1/titles/{second.pk}/reviews/'), (
+            'Проверьте, что количество запросов к базе при получении списка '
+            'отзывов не зависит от количества авторов на странице'
+        )
+
+    def test_values_fast_path_matches_serializer(self, settings):
+        create_titles(1)
+        title = Title.objects.get()
+        for i in range(3):
+            author = User.objects.create(
+                username=f'author-{i}', email=f'author-{i}@yamdb.fake'
+            )
+            Review.objects.create(
+                title=title, author=author, text='Текст', score=i + 1
+            )
+        client = APIClient()
+        for query in ('', '?fields=id,score', '?omit=text,title'):
+            url = f'/api/v1/titles/{title.pk}/reviews/{query}'
+            settings.VALUES_LIST_FAST_PATH = True
+            fast = client.get(url).json()
+            settings.VALUES_LIST_FAST_PATH = False
+            assert fast == client.get(url).json(), (
+                f'Проверьте, что `{url}` отдает одинаковый ответ через '
+                '.values() и через сериализатор'
+            )
+        assert list(fast['results'][0]) == ['id', 'author', 'score',
+                                            'pub_date']
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_fields_narrow_sql(self):
+        create_titles(2)
+        client = APIClient()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?fields=id,name')
+        assert [list(item) for item in response.json()['results']] == [
+            ['id', 'name'], ['id', 'name']
+        ], 'Проверьте, что ?fields= оставляет только перечисленные поля'
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        assert 'description' not in sql and 'reviews_genre' not in sql, (
+            'Проверьте, что невыбранные поля и связи не загружаются из БД'
+        )
+
+    def test_unknown_fields_skipped(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        create_titles(1)
+        client = APIClient()
+        default = list(
+            client.get('/api/v1/titles/').json()['results'][0]
+        )
+        response = client.get('/api/v1/titles/?fields=foo')
+        assert list(response.json()['results'][0]) == default, (
+            'Проверьте, что неизвестные имена в ?fields= пропускаются'
+        )
+        response = client.get('/api/v1/titles/?fields=score_counts,foo')
+        assert list(response.json()['results'][0]) == default + [
+            'score_counts'
+        ], (
+            'Проверьте, что неизвестное имя рядом с необязательным полем '
+            'не отключает обычные поля'
+        )
@@ -0,0 +1,115 @@
+import pytest
+from api.cache import TITLES, get_versions
+from django.core.management import call_command
+from reviews.models import Review, Title
+from reviews.utils import calculate_title_ratings, rebuild_title_ratings
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class TestScoreCounts:
+
+    def test_score_counts_follow_review_changes(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        other = Title.objects.create(name='Другое', year=2000)
+        users = [
+            User.objects.create(username=f'user{i}', email=f'{i}@yamdb.fake')
+            for i in range(3)
+        ]
+        reviews = [
+            Review.objects.create(
+                title=title, author=user, text='Текст', score=score
+            )
+            for user, score in zip(users, (2, 9, 9))
+        ]
+        reviews[0].score = 4
+        reviews[0].save()
+        reviews[1].title = other
+        reviews[1].save()
+        reviews[2].delete()
+        Review.objects.create(title=title, author=users[2], text='Еще',
+                              score=10)
+
+        title.refresh_from_db()
+        assert title.score_counts == [0, 0, 0, 1, 0, 0, 0, 0, 0, 1], (
+            'Проверьте, что распределение оценок обновляется при '
+            'создании, изменении и удалении отзыва'
+        )
+        assert title.median_score == 7
+        assert calculate_title_ratings()[title.pk] == (
+            title.reviews_count, title.score_sum, title.rating,
+            title.score_counts,
+        ), 'Проверьте, что хранимые агрегаты совпадают с пересчитанными'
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleRating:
+
+    def test_rating_follows_review_changes(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        first, second = (
+            User.objects.create(username=f'user{i}', email=f'{i}@yamdb.fake')
+            for i in range(2)
+        )
+        review = Review.objects.create(
+            title=title, author=first, text='Текст', score=4
+        )
+        Review.objects.create(
+            title=title, author=second, text='Текст', score=8
+        )
+        title.refresh_from_db()
+        assert (title.reviews_count, title.rating) == (2, 6), (
+            'Проверьте, что рейтинг пересчитывается при создании отзыва'
+        )
+
+        review.score = 10
+        review.save()
+        title.refresh_from_db()
+        assert (title.reviews_count, title.rating) == (2, 9), (
+            'Проверьте, что рейтинг пересчитывается при изменении оценки'
+        )
+
+        review.delete()
+        title.refresh_from_db()
+        assert (title.reviews_count, title.rating) == (1, 8), (
+            'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+        )
+        Review.objects.all().delete()
+        title.refresh_from_db()
+        assert (title.reviews_count, title.rating) == (0, None), (
+            'Проверьте, что у произведения без отзывов нет рейтинга'
+        )
+
+    def test_rebuild_repairs_drifted_aggregates(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        untouched = Title.objects.create(name='Другое', year=2000)
+        user = User.objects.create(username='user', email='u@yamdb.fake')
+        Review.objects.create(title=title, author=user, text='Текст',
+                              score=7)
+        Title.objects.filter(pk=title.pk).update(
+            reviews_count=5, score_sum=3, rating=0.6
+        )
+
+        assert rebuild_title_ratings() == [title.pk], (
+            'Проверьте, что rebuild_title_ratings возвращает id '
+            'произведений с расходящимися агрегатами'
+        )
+        title.refresh_from_db()
+        assert (title.reviews_count, title.score_sum, title.rating) == (
+            1, 7, 7
+        ), 'Проверьте, что rebuild_title_ratings исправляет агрегаты'
+        assert rebuild_title_ratings() == [], (
+            'Проверьте, что повторный пересчет ничего не меняет'
+        )
+        untouched.refresh_from_db()
+        assert untouched.reviews_count == 0 and untouched.rating is None
+
+    def test_rebuild_command_resets_title_cache(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        Title.objects.filter(pk=title.pk).update(reviews_count=3)
+        versions = get_versions((TITLES,))
+        call_command('rebuild_title_ratings')
+        assert get_versions((TITLES,)) != versions, (
+            'Проверьте, что rebuild_title_ratings сбрасывает кэш ответов '
+            'с произведениями после исправления агрегатов'
+        )
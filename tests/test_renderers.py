@@ -0,0 +1,43 @@
+import io
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from api.renderers import FastJSONParser, FastJSONRenderer
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+
+class TestFastJSON:
+
+    data = {
+        'name': 'Произведение\u2028',
+        'pub_date': datetime(2020, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+        'score': Decimal('7.5'),
+        'label': gettext_lazy('Genre'),
+        'rating': None,
+        'ids': [1, 2, 3],
+    }
+
+    @pytest.mark.parametrize('backend', ['orjson', 'stdlib'])
+    def test_same_output_as_json_renderer(self, settings, backend):
+        pytest.importorskip('orjson')
+        settings.JSON_BACKEND = backend
+        assert (
+            FastJSONRenderer().render(self.data)
+            == JSONRenderer().render(self.data)
+        ), (
+            'Проверьте, что ответ FastJSONRenderer совпадает с ответом '
+            'JSONRenderer'
+        )
+
+    def test_parser_rejects_invalid_json(self, settings):
+        settings.JSON_BACKEND = 'orjson'
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"text": '))
+        assert FastJSONParser().parse(
+            io.BytesIO('{"text": "отзыв"}'.encode())
+        ) == {'text': 'отзыв'}, (
+            'Проверьте, что FastJSONParser разбирает тело запроса'
+        )
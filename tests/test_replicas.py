@@ -0,0 +1,164 @@
+import pytest
+from api import db_router
+from api.authentication import token_for_user
+from api.cache import RESOURCES, changed_key
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
+from reviews.models import Title
+from users.models import User
+
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    settings.DATABASE_REPLICAS = {'replica1': 1, 'replica2': 0}
+    down = set()
+    monkeypatch.setattr(db_router, 'is_available', lambda a: a not in down)
+    return down
+
+
+def make_request(user=None):
+    request = APIRequestFactory().get('/api/v1/titles/')
+    request.user = user or AnonymousUser()
+    return request
+
+
+@pytest.mark.django_db
+class TestReplicaRouting:
+
+    def test_reads_go_to_weighted_replica(self, replicas):
+        chosen = {
+            db_router.choose_read_database(make_request())
+            for _ in range(20)
+        }
+        assert chosen == {'replica1'}, (
+            'Проверьте, что чтение идет на реплику и реплика с весом 0 '
+            'не используется'
+        )
+
+    def test_fallback_to_primary(self, replicas):
+        replicas.add('replica1')
+        assert db_router.choose_read_database(make_request()) == 'default', (
+            'Проверьте, что при недоступной реплике чтение идет с primary'
+        )
+
+    def test_read_your_writes(self, replicas):
+        user = User.objects.create(username='writer', email='w@yamdb.fake')
+        db_router.mark_sticky(user)
+        assert db_router.choose_read_database(
+            make_request(user)
+        ) == 'default', (
+            'Проверьте, что после записи пользователь читает с primary'
+        )
+
+    def test_writes_go_to_primary(self):
+        router = db_router.ReplicaRouter()
+        token = db_router.read_database.set('replica1')
+        try:
+            assert router.db_for_write(User) == 'default'
+            assert router.db_for_read(User) == 'replica1'
+        finally:
+            db_router.read_database.reset(token)
+
+
+def read_from(client, url, table):
+    """Ответ на GET и базы, из которых читалась таблица table.
+    Пользователь для проверки токена всегда читается с primary."""
+    with CaptureQueriesContext(connections['replica1']) as replica, (
+        CaptureQueriesContext(connections['default'])
+    ) as primary:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, {
+        alias
+        for alias, context in (('replica1', replica), ('default', primary))
+        for query in context.captured_queries
+        if f'FROM "{table}"' in query['sql']
+    }
+
+
+def replicated():
+    """Реплики догнали primary: отметки недавних изменений истекли."""
+    cache.delete_many([changed_key(resource) for resource in RESOURCES])
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica1'])
+class TestReplicaRequests:
+
+    @pytest.fixture(autouse=True)
+    def replica(self, settings):
+        settings.DATABASE_REPLICAS = {'replica1': 1}
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        cache.clear()
+        db_router._down_until.clear()
+        yield
+        db_router._down_until.clear()
+
+    def test_list_reads_from_replica(self):
+        title = Title.objects.create(name='Произведение', year=2000)
+        user = User.objects.create(username='writer', email='w@yamdb.fake')
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {token_for_user(user).access_token}'
+        )
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        replicated()
+        _, databases = read_from(client, url, 'reviews_review')
+        assert databases == {'replica1'}, (
+            'Проверьте, что список отзывов читается с реплики'
+        )
+
+        assert client.post(
+            url, {'text': 'Отзыв', 'score': 8}
+        ).status_code == 201
+        response, databases = read_from(client, url, 'reviews_review')
+        assert response.json()['count'] == 1
+        assert databases == {'default'}, (
+            'Проверьте, что после записи пользователь читает с primary'
+        )
+
+    def test_replica_failure_mid_request(self):
+        Title.objects.create(name='Произведение', year=2000)
+        replicated()
+
+        def broken(execute, sql, params, many, context):
+            raise OperationalError('server closed the connection')
+
+        with connections['replica1'].execute_wrapper(broken):
+            response, databases = read_from(
+                APIClient(), '/api/v1/titles/', 'reviews_title'
+            )
+        assert response.json()['count'] == 1 and 'default' in databases, (
+            'Проверьте, что при отказе реплики посреди запроса он '
+            'повторяется на primary'
+        )
+        assert not db_router.is_available('replica1'), (
+            'Проверьте, что отказавшая реплика временно не используется'
+        )
+
+    def test_cache_not_filled_from_lagging_replica(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 300
+        client = APIClient()
+        Title.objects.create(name='Произведение', year=2000)
+        replicated()
+        _, databases = read_from(client, '/api/v1/titles/', 'reviews_title')
+        assert databases == {'replica1'}
+
+        Title.objects.create(name='Новое', year=2001)
+        response, databases = read_from(
+            client, '/api/v1/titles/', 'reviews_title'
+        )
+        assert databases == {'default'}, (
+            'Проверьте, что сразу после изменения ресурса ответы для '
+            'кэша читаются с primary, а не с отстающей реплики'
+        )
+        assert response.json()['count'] == 2
+        replicated()
+        response, databases = read_from(
+            client, '/api/v1/titles/', 'reviews_title'
+        )
+        assert databases == set() and response.json()['count'] == 2, (
+            'Проверьте, что в кэш под новой версией попал ответ с primary'
+        )
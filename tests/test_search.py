@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+from reviews.models import Genre, Title
+
+
+def search(query):
+    response = APIClient().get('/api/v1/titles/', {'search': query})
+    assert response.status_code == 200
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestTitleSearch:
+
+    @pytest.fixture(autouse=True)
+    def titles(self):
+        Title.objects.create(
+            name='Война и мир', year=1869,
+            description='Роман о войне: война и мир',
+        )
+        Title.objects.create(name='Война', year=2000)
+        Title.objects.create(name='Звезды', year=2000)
+
+    def test_finds_matching_titles(self):
+        assert set(search('война')) == {'Война и мир', 'Война'}, (
+            'Проверьте, что поиск возвращает произведения, в названии или '
+            'описании которых есть слово запроса'
+        )
+        assert search('!!!') == [], (
+            'Проверьте, что запрос без слов ничего не находит'
+        )
+
+    @pytest.mark.skipif(
+        connection.vendor == 'postgresql',
+        reason='Индекс в памяти используется только вне PostgreSQL.',
+    )
+    def test_inverted_index_ranking(self):
+        assert search('вой') == ['Война и мир', 'Война'], (
+            'Проверьте, что результаты поиска упорядочены по '
+            'релевантности: чаще встречающееся слово выше'
+        )
+        assert search('звезда') == [], (
+            'Проверьте, что слово запроса совпадает только с началом '
+            'слов произведения'
+        )
+        Title.objects.create(name='Звездаки', year=2001)
+        assert search('звезда') == ['Звездаки'], (
+            'Проверьте, что индекс перестраивается после изменения '
+            'произведений'
+        )
+
+
+@pytest.mark.django_db
+class TestGenreSearch:
+
+    def test_search_by_name_ignores_case(self, settings):
+        settings.RESPONSE_CACHE_TIMEOUT = 0
+        Genre.objects.create(name='Drama', slug='drama')
+        Genre.objects.create(name='Comedy', slug='comedy')
+        response = APIClient().get('/api/v1/genres/', {'search': 'dRAM'})
+        assert response.status_code == 200
+        assert [genre['slug'] for genre in response.json()['results']] == [
+            'drama'
+        ], 'Проверьте, что поиск жанров по названию не зависит от регистра'